@@ -1,255 +1,9 @@
 # This is a program to simulate the transmission of packets using BCN (on top of TCP)
 # Used for ELEC4848 FYP
 # author: Law Lok Hin Andrew (3035571424) 
+# BCN is implemented in netsim/control.py (BcnControl), this program sets the constants
 
-import enum
-
-class BcnMessage(enum.Enum):
-    NORMAL = 0 # BCN normal message
-    STOP = 1   # BCN stop message
-    NIL = 2    # no BCN message sent
-
-# buffer used in the switch
-class Buffer:
-    def __init__(self, max):
-        self.max = max # max size of the buffer
-        self.element = [] # the queue of the buffer
-        self.size = 0 # the current size of the buffer
-        
-    def isEmpty(self):
-        if self.size == 0:
-            return True
-        else:
-            return False
-    
-    def isFull(self):
-        if self.size == self.max:
-            return True
-        else:
-            return False
-    
-    def getSize(self):
-        return self.size
-
-    def push(self, newElement):
-        if not self.isFull():
-            self.element.append(newElement)
-            self.size += 1
-    
-    def pop(self):
-        if not self.isEmpty():
-            returnElement = self.element[0]
-            self.element = self.element[1:]
-            self.size -= 1
-            return returnElement
-
-# receiver to receive the packets sent by senders
-class Receiver:
-    def __init__(self, numSender, numPacket):
-        self.numSender = numSender # the number of senders in the system
-        self.numPacket = numPacket # the number of packets expected from each senders
-        self.time = 0 # global time for data analysis
-        self.overhead = 0 # counting the num of ACK sent
-        self.ackCounter = {} # counting the packets ACKed
-        for i in range(numSender):
-            self.ackCounter[i] = 0
-    
-    def checkFinish(self): # check if all transmission are finished
-        for i in range(self.numSender):
-            if self.ackCounter[i] < self.numPacket:
-                return False
-        else:
-            return True
-        
-    def timePass(self): # update the timers
-        self.time += 1
-    
-    def getOverhead(self): # get the overhead count
-        return self.overhead
-
-    """
-    packets received : {"sender": self.id, "sentTime": self.time, "packetNum": packetNum}
-    output: "sender;packet;sendTime;ReceiveTime;rate"
-    """
-
-    def handlePacket(self, packet): # will return the correct ACK when receive packet
-        if packet != {}:
-            msg = str(packet["sender"]) + ";"
-            msg += str(packet["packetNum"]) + ";"
-            msg += str(packet["sentTime"]) + ";"
-            msg += str(self.time) + ";"
-            msg += str(packet["rate"])
-            print(msg) # print out received packets
-            id = packet["sender"]
-            packetNum = packet["packetNum"]
-            if packetNum == self.ackCounter[id]:
-                self.ackCounter[id] += 1
-            ack = (id, packetNum)
-            self.overhead += 1
-            return ack  
-
-# senders to send packets to the receiver 
-class Sender:
-    def __init__(self, id, num, window, rate):
-        self.id = id # id of the sender
-        self.num = num # num of packets to send
-        self.window = window # time to wait before timeout
-        self.rate = rate # rate for rate regulator (if any)
-        self.sent = 0 # num of packets sent
-        self.ack = 0 # num of packets ACKed
-        self.time = 0 # num of cycle passed since beginning
-        self.waitTimer = {} # timer for the oldest not ACKed packet
-        for i in range(num):
-            self.waitTimer[i] = -1 # -1 means the timer is not active
-        # variables for BCN
-
-    
-    def ackPacket(self, ptr): # ACK the packet
-        if ptr == self.ack:
-            self.ack += 1
-            self.waitTimer[ptr] = -2 # -2 means timer stopped
-    
-    def timePass(self): # updating timers for every cycle pass
-        self.time += 1
-        for i in range(self.num):
-            if self.waitTimer[i] >= 0:
-                self.waitTimer[i] += 1
-    
-    def checkTimeout(self): # checking any packets sent timeout
-        for i in range(self.num):
-            if self.waitTimer[i] >= self.window:
-                return i
-            else:
-                return -1
-    
-    """
-    packets sent : {"sender": self.id, "sentTime": self.time, "packetNum": packetNum}
-    
-    """
-    def sendPacket(self):
-        global bcn
-        if self.ack < self.num: # transmission not finished
-            if self.time % self.rate == 0 and bcn != BcnMessage.STOP: # ready according to rate regulator, bcn message != stop
-                timeout = self.checkTimeout()
-                packet = {}
-                if self.rate > SENDER_RATE: # for BCN, rate limited tag
-                    packet["tagged"] = True
-                else:
-                    packet["tagged"] = False
-                if self.sent < self.num: # not all packets sent at least once
-                    if timeout == -1: # no timeout
-                        packet["sender"] = self.id
-                        packet["sentTime"] = self.time
-                        packet["packetNum"] = self.sent
-                        packet["rate"] = self.rate
-                        self.sent += 1
-                    else: # timeout
-                        packet["sender"] = self.id
-                        packet["sentTime"] = self.time
-                        packet["packetNum"] = timeout
-                        packet["rate"] = self.rate
-                        self.waitTimer[timeout] = 0 # restart timer
-                else: # all packets sent at least once
-                    if timeout == -1:
-                        packet = {} # wait for timeout
-                    else:
-                        packet["sender"] = self.id
-                        packet["sentTime"] = self.time
-                        packet["packetNum"] = timeout
-                        packet["rate"] = self.rate
-                        self.waitTimer[timeout] = 0 # restart timer
-                #print(bcn) # debug
-                if bcn == BcnMessage.NORMAL:
-                    self.rateUpdate()
-            else: # not ready to sent according to rate regulator
-                packet = {}
-        else: # transmission finished
-            packet = {}
-        return packet    
-    
-    # methods for BCN
-    def rateUpdate(self): # update the rate using Congestion measure and AIMD algorithm
-        global congestionMeasure
-        #print("Congestion Measure: ",congestionMeasure) # debug
-        if congestionMeasure < 0: # decrease rate (increase in number)
-            #print("decrease")
-            self.rate = round(self.rate * (1 - congestionMeasure / 40))
-        if congestionMeasure > 0: # increase rate (decrease in number)
-            #print("increase")
-            newRate = self.rate - congestionMeasure
-            if newRate <= 0:
-                self.rate = 1
-            else:
-                self.rate = newRate
-        
-# switch to relay packets sent from senders to the receiver
-class Switch:
-    def __init__(self, max, rate):
-        self.buffer = Buffer(max) # the buffer of the switch
-        self.rate = rate # rate regulator for simulation
-        self.time = 0 # global time
-        # variables added for BCN
-        self.qEq = round(max * 0.25) # equilibrium length
-        self.qSc = round(max * 0.75) # severe congestion length
-        self.weight = 1 # the weight of qDelta in congestion measure
-        self.prevSize = 0 # the previous size of buffer
-        self.overhead = 0 # counting the number of bcn signal sent
-
-    def timePass(self): # update time
-        self.time += 1
-
-    def bufferSize(self): # return current size of buffer
-        return self.buffer.getSize()
-        
-    def receive(self, newElement):
-        if newElement != {}:
-            self.buffer.push(newElement)
-        
-    def send(self):
-        if self.time % self.rate == 0: # ready to relay according to rate regulator
-            if self.buffer.isEmpty(): # nothing to relay
-                return {}
-            else: # something to relay
-                global congestionMeasure
-                global bcn
-                packet = self.buffer.pop() # fetch the packet
-                congestionMeasure = self.congestionMeasure() # sampling for BCN
-                bcn = self.sendBcnMessage(packet) # send the bcn signal
-                self.overhead += 1
-                #print(bcn) #debug
-                self.prevSize = self.bufferSize() # update prevSize
-                return packet # relay the packet
-        else: # not ready to relay
-            return {}
-
-    # methods added for BCN
-    def qOff(self):
-        return self.qEq - self.bufferSize()
-    
-    def qDelta(self):
-        return self.prevSize - self.bufferSize()
-    
-    def congestionMeasure(self): # ei
-        return self.qOff() - self.weight * self.qDelta()
-
-    def sendBcnMessage(self, packet):
-        if packet != {}:
-            if self.bufferSize() <= self.qEq:
-                if packet["tagged"]:
-                    return BcnMessage.NORMAL
-                else:
-                    return BcnMessage.NIL
-            if self.bufferSize() > self.qEq and self.bufferSize() <= self.qSc:
-                return BcnMessage.NORMAL
-            if self.bufferSize() > self.qSc:
-                return BcnMessage.STOP
-
-
-
-            
-"""  
-main program
-"""
+from netsim import SimulationConfig, run_simulation
 
 # Constants, can be changed if neccessary
 BUFFER_MAX = 20
@@ -258,38 +12,44 @@ NUM_PACKET = 200
 WINDOW = 50
 SENDER_RATE = 10 # default rate of senders
 SWITCH_RATE = 10 # default rate of switch
-
-# initialization
-switch = Switch(BUFFER_MAX, SWITCH_RATE)
-receiver = Receiver(NUM_SENDER, NUM_PACKET)
-sender = {}
-for i in range(NUM_SENDER):
-    sender[i] = Sender(i, NUM_PACKET, WINDOW, SENDER_RATE)
-time = 0
-# variables for BCN
-congestionMeasure = 0
-bcn = BcnMessage.NIL
-
-# simulation
-while not receiver.checkFinish():
-    #print("Congestion Measure: ",congestionMeasure)
-    #print("Buffer Size: ",switch.bufferSize())
-    # switch relay packets in the buffer
-    packet = switch.send()
-    if packet != {}:
-        ack = receiver.handlePacket(packet)
-        sender[ack[0]].ackPacket(ack[1])
-    # switch receive packets
-    for i in range(NUM_SENDER):
-        switch.receive(sender[i].sendPacket())
-    # update time
-    for i in range(NUM_SENDER):
-        sender[i].timePass()
-    receiver.timePass()
-    switch.timePass()
-
-# return overhead count
-print("ACK sent: ", receiver.overhead)
-print("BCN signal sent: ", switch.overhead)
-#overhead = receiver.overhead + switch.overhead
-#print("Overhead: ", overhead)
\ No newline at end of file
+SENDER_BACKEND = "object" # "object": one Sender each, "array": vectorized SenderPopulation (needs NumPy)
+TRACE_LEVEL = "full" # "off": no trace, "summary": totals only, "full": every received packet
+TRACE_OUTPUT = None # for "full", None: print, "*.csv": text file, otherwise directory of binary columns
+TIME_LIMIT = None # stop after this many cycles even if not finished (e.g. deadlock after drops), None for no limit
+PROFILE = False # count calls and time spent per component, and print a report at the end
+TOPOLOGY = None # None: one switch, otherwise a topology description (see netsim/topology.py)
+ARRIVALS = "periodic" # "periodic": send every rate cycles, "poisson" or "onoff" (see netsim/arrivals.py)
+FLOW_SIZE = "fixed" # "fixed": NUM_PACKET packets each, "pareto": heavy tailed sizes with mean NUM_PACKET
+SEED = 0 # seed of the random traffic
+FAST_FORWARD = False # skip whole periods once the run repeats itself exactly (see netsim/steadystate.py)
+STATS_INTERVAL = None # cycles between records of streaming statistics (see netsim/stats.py), None for none
+STATS_OUTPUT = None # None: print the records, otherwise a file of JSON lines
+CONVERGENCE = None # stop once converged: "band" or "batchMeans" (see netsim/convergence.py), None to run to the end
+LINK_DELAY = 0 # propagation delay of the switch to the receiver (cycles)
+ACK_DELAY = 0 # propagation delay of the ACKs back to the senders (cycles)
+RATE_DIVISIONS = 1 # rates are multiples of 1 / RATE_DIVISIONS cycle (a power of 2), 1 for integer rates
+FEEDBACK_DELAY = 0 # propagation delay of the BCN messages to the senders (cycles)
+
+def main(): # run the simulation with the constants above, returns the summary metrics
+    config = SimulationConfig(bufferMax=BUFFER_MAX, numSender=NUM_SENDER, numPacket=NUM_PACKET, window=WINDOW,
+        senderRate=SENDER_RATE, switchRate=SWITCH_RATE, senderBackend=SENDER_BACKEND, traceLevel=TRACE_LEVEL,
+        traceOutput=TRACE_OUTPUT, timeLimit=TIME_LIMIT, profile=PROFILE, topology=TOPOLOGY,
+        arrivals=ARRIVALS, flowSize=FLOW_SIZE, seed=SEED, fastForward=FAST_FORWARD,
+        statsInterval=STATS_INTERVAL, statsOutput=STATS_OUTPUT, convergence=CONVERGENCE,
+        linkDelay=LINK_DELAY, ackDelay=ACK_DELAY, feedbackDelay=FEEDBACK_DELAY, rateDivisions=RATE_DIVISIONS)
+    return run_simulation(config, "bcn")
+
+if __name__ == "__main__":
+    result = main()
+    if TRACE_LEVEL == "summary":
+        print("Packets received: ", result["received"])
+        print("Mean delay: ", result["meanDelay"])
+        print("Max delay: ", result["maxDelay"])
+    if PROFILE:
+        from netsim.metrics import formatReport
+        print(formatReport(result["profile"]))
+    # return overhead count
+    print("ACK sent: ", result["ackSent"])
+    print("BCN signal sent: ", result["bcnSent"])
+    #overhead = result["ackSent"] + result["bcnSent"]
+    #print("Overhead: ", overhead)
\ No newline at end of file
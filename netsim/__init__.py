@@ -0,0 +1,17 @@
+# Simulation core for the ELEC4848 FYP simulators (template.py, bcn.py, fecn.py)
+# run_simulation(config, protocol) runs one simulation and returns its summary metrics
+
+from netsim.buffer import Buffer
+from netsim.config import SimulationConfig
+from netsim.control import BcnControl, BcnMessage, FecnControl, NoControl, makeControl
+from netsim.engine import EventQueue, nextMultiple
+from netsim.packet import Packet
+from netsim.receiver import Receiver
+from netsim.sender import Sender
+from netsim.simulation import Simulation, run_simulation
+from netsim.switch import Switch
+from netsim.timers import TimerHeap
+from netsim.topology import Topology
+from netsim.trace import openTrace, exportCsv
+from netsim import checkpoint, live
+# netsim.population (vectorized senders) needs NumPy and is imported on its own
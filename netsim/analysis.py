@@ -0,0 +1,169 @@
+# Analysis of binary traces (netsim.trace.BinaryTrace) of any size (needs NumPy)
+# The columns are opened with np.memmap and read a chunk of records at a time, every result is accumulated
+# with vectorized operations into arrays sized by the num of senders, the max delay or the num of time bins,
+# never by the num of records, so the memory used stays flat however large the trace file is.
+#
+# usage: python -m netsim.analysis TRACE_DIR [--bin 1000] [--output analysis.json]
+#
+# Retransmissions are the records whose packetNum is not above the highest one already received from their
+# sender: the packets of a sender follow one route in order, so only a resent packet can arrive out of sequence.
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from netsim.trace import FIELDS, readMeta
+
+CHUNK = 1 << 20 # records per chunk
+
+def memmapColumns(directory): # field -> read only np.memmap of the column (empty arrays for an empty trace)
+    meta = readMeta(directory)
+    columns = {}
+    for field in FIELDS:
+        dtype = np.dtype(meta["dtypes"][field])
+        if meta["count"] == 0:
+            columns[field] = np.empty(0, dtype)
+        else:
+            columns[field] = np.memmap(os.path.join(directory, field + ".bin"), dtype, "r", shape=(meta["count"],))
+    return columns
+
+def grow(array, size, fill=0): # array extended to size (per sender or per bin accumulators)
+    if len(array) >= size:
+        return array
+    extended = np.full(size, fill, dtype=array.dtype)
+    extended[:len(array)] = array
+    return extended
+
+class TraceAnalysis:
+    def __init__(self, directory, chunk=CHUNK):
+        self.directory = directory
+        self.chunk = chunk
+        self.columns = memmapColumns(directory)
+        self.count = len(self.columns["sender"]) # num of records
+
+    def chunks(self, *fields): # dicts of field -> chunk of the column, in record order
+        for start in range(0, self.count, self.chunk):
+            stop = min(start + self.chunk, self.count)
+            yield dict((field, np.asarray(self.columns[field][start:stop])) for field in fields)
+
+    def flows(self): # per sender: records, retransmissions, goodput (new packets per cycle), first and last receive time
+        received = np.zeros(0, np.int64)
+        retransmissions = np.zeros(0, np.int64)
+        highest = np.zeros(0, np.int64) # highest packetNum received from each sender so far, -1 for none
+        first = np.zeros(0, np.int64)
+        last = np.zeros(0, np.int64)
+        end = 0
+        for chunk in self.chunks("sender", "packetNum", "receiveTime"):
+            sender = chunk["sender"]
+            if len(sender) == 0:
+                continue
+            numSender = int(sender.max()) + 1
+            received = grow(received, numSender)
+            retransmissions = grow(retransmissions, numSender)
+            highest = grow(highest, numSender, -1)
+            first = grow(first, numSender, -1)
+            last = grow(last, numSender)
+            received += np.bincount(sender, minlength=len(received))
+            order = np.argsort(sender, kind="stable") # records of each sender together, in arrival order
+            ids = sender[order]
+            packetNum = chunk["packetNum"][order]
+            time = chunk["receiveTime"][order]
+            starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+            # highest packetNum before each record: running max within each sender, carried over from the chunks before
+            # (an offset per sender keeps the running max of np.maximum.accumulate from crossing senders)
+            offset = (ids - ids[0]) * (int(max(packetNum.max(), highest.max())) + 2)
+            carried = np.empty(len(ids), np.int64)
+            carried[1:] = packetNum[:-1]
+            carried[starts] = highest[ids[starts]]
+            before = np.maximum.accumulate(carried + 1 + offset) - 1 - offset # +1 so that none (-1) is not below the offset
+            retransmissions += np.bincount(ids[packetNum <= before], minlength=len(retransmissions))
+            ends = np.r_[starts[1:], len(ids)] - 1
+            highest[ids[starts]] = np.maximum(before[ends], packetNum[ends])
+            new = first[ids[starts]] < 0
+            first[ids[starts][new]] = time[starts][new]
+            last[ids[starts]] = time[ends]
+            end = max(end, int(chunk["receiveTime"].max()))
+        goodput = (received - retransmissions) / end if end > 0 else np.zeros(len(received))
+        return {"received": received, "retransmissions": retransmissions, "goodput": goodput, "firstTime": first,
+            "lastTime": last}
+
+    def delayCdf(self): # (delays, fraction of the records with at most that delay), exact, for the delays seen
+        counts = np.zeros(0, np.int64)
+        for chunk in self.chunks("sentTime", "receiveTime"):
+            delay = chunk["receiveTime"] - chunk["sentTime"]
+            if len(delay) == 0:
+                continue
+            chunkCounts = np.bincount(delay)
+            counts = grow(counts, len(chunkCounts))
+            counts[:len(chunkCounts)] += chunkCounts
+        delays = np.flatnonzero(counts)
+        if self.count == 0:
+            return delays, np.zeros(0)
+        return delays, np.cumsum(counts[delays]) / self.count
+
+    def delayPercentiles(self, percentiles=(50, 99, 99.9)): # delay at each percentile (the smallest delay reaching it)
+        delays, cdf = self.delayCdf()
+        if len(delays) == 0:
+            return [0] * len(percentiles)
+        return [int(delays[min(np.searchsorted(cdf, p / 100 - 1e-12), len(delays) - 1)]) for p in percentiles]
+
+    def rateTrajectories(self, binWidth): # [sender, bin] mean rate of the packets received in each bin (NaN: none)
+        sums = np.zeros((0, 0))
+        counts = np.zeros((0, 0), np.int64)
+        for chunk in self.chunks("sender", "receiveTime", "rate"):
+            sender = chunk["sender"]
+            if len(sender) == 0:
+                continue
+            bins = chunk["receiveTime"] // binWidth
+            shape = (max(sums.shape[0], int(sender.max()) + 1), max(sums.shape[1], int(bins.max()) + 1))
+            if shape != sums.shape:
+                sums = np.pad(sums, ((0, shape[0] - sums.shape[0]), (0, shape[1] - sums.shape[1])))
+                counts = np.pad(counts, ((0, shape[0] - counts.shape[0]), (0, shape[1] - counts.shape[1])))
+            np.add.at(sums, (sender, bins), chunk["rate"])
+            np.add.at(counts, (sender, bins), 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+
+    def queueSeries(self, binWidth):
+        # packets between their sender and the receiver at the start of each bin (sentTime <= t < receiveTime):
+        # the switch queue when there are no propagation delays
+        change = np.zeros(0, np.int64)
+        for chunk in self.chunks("sentTime", "receiveTime"):
+            if len(chunk["sentTime"]) == 0:
+                continue
+            enter = -(-chunk["sentTime"] // binWidth) # first bin start at or after the send
+            leave = -(-chunk["receiveTime"] // binWidth) # first bin start at or after the receive
+            change = grow(change, int(leave.max()) + 1)
+            change += np.bincount(enter, minlength=len(change)) - np.bincount(leave, minlength=len(change))
+        return np.cumsum(change)[:-1] if len(change) else change
+
+    def summary(self, binWidth=1000): # the results as plain data (JSON)
+        flows = self.flows()
+        p50, p99, p999 = self.delayPercentiles()
+        return {"records": self.count, "received": flows["received"].tolist(),
+            "retransmissions": flows["retransmissions"].tolist(), "goodput": flows["goodput"].tolist(),
+            "p50Delay": p50, "p99Delay": p99, "p999Delay": p999, "binWidth": binWidth,
+            "queue": self.queueSeries(binWidth).tolist(),
+            "rate": [[None if np.isnan(rate) else float(rate) for rate in row] for row in self.rateTrajectories(binWidth)]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="analyze a binary trace directory")
+    parser.add_argument("trace", help="directory of the binary trace (TRACE_OUTPUT)")
+    parser.add_argument("--bin", type=int, default=1000, help="cycles per bin of the time series")
+    parser.add_argument("--output", help="write the results as JSON (default: print a per-flow table)")
+    args = parser.parse_args(argv)
+    analysis = TraceAnalysis(args.trace)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(analysis.summary(args.bin), f)
+        return
+    flows = analysis.flows()
+    print("%d records, delay p50/p99/p99.9: %s" % (analysis.count, "/".join(map(str, analysis.delayPercentiles()))))
+    print("sender;received;retransmissions;goodput")
+    for id in range(len(flows["received"])):
+        print("%d;%d;%d;%.6f" % (id, flows["received"][id], flows["retransmissions"][id], flows["goodput"][id]))
+
+if __name__ == "__main__":
+    main()
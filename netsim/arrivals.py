@@ -0,0 +1,171 @@
+# Stochastic traffic for the senders (needs NumPy)
+# By default senders are periodic: ready every `rate` cycles. An arrival process replaces that with random
+# send times which keep `rate` as the mean gap, so BCN and FECN still control the senders through their rates.
+# Every sender has its own generator (spawned from the seed of the config), whose draws are made in batches
+# and consumed one at a time, so both sender backends see the same sample paths and drawing stays cheap.
+# Flow size processes draw the num of packets of each sender instead of NUM_PACKET for all.
+
+import math
+
+import numpy as np
+
+BATCH = 256 # draws made at a time per sender
+ON_OFF_VECTOR = 64 # senders from which OnOffArrivals.nextTimes uses array operations (their overhead is fixed)
+
+class RandomStreams: # one seeded generator per sender, each with a buffer of draws
+    def __init__(self, numSender, seed, draw, batch=BATCH):
+        self.draw = draw # name of the Generator method, e.g. "standard_exponential"
+        self.batch = batch
+        self.generators = [np.random.default_rng(child) for child in seed.spawn(numSender)]
+        self.draws = np.empty((numSender, batch))
+        self.position = np.full(numSender, batch, dtype=np.int64) # next unused draw of each sender
+
+    def refill(self, ids):
+        for id in ids:
+            self.draws[id] = getattr(self.generators[id], self.draw)(self.batch)
+            self.position[id] = 0
+
+    def take(self, id): # next draw of sender id
+        if self.position[id] == self.batch:
+            self.refill([id])
+        value = self.draws[id, self.position[id]]
+        self.position[id] += 1
+        return float(value)
+
+    def takeMany(self, ids): # next draw of each sender of ids (distinct)
+        empty = ids[self.position[ids] == self.batch]
+        if len(empty):
+            self.refill(empty.tolist())
+        values = self.draws[ids, self.position[ids]]
+        self.position[ids] += 1
+        return values
+
+    def peek(self, ids, count): # next count draws (at most batch) of each sender of ids (distinct), not consumed
+        short = ids[self.batch - self.position[ids] < count]
+        for id in short.tolist(): # keep the unused draws and continue the stream of the generator after them
+            position = int(self.position[id])
+            left = self.batch - position
+            self.draws[id, :left] = self.draws[id, position:]
+            self.draws[id, left:] = getattr(self.generators[id], self.draw)(position)
+            self.position[id] = 0
+        return self.draws[ids[:, None], self.position[ids][:, None] + np.arange(count)]
+
+    def skip(self, ids, counts): # consume counts draws of each sender of ids (distinct), at most those peeked
+        self.position[ids] += counts
+
+class PeriodicArrivals: # ready every `rate` cycles (the default, handled by the senders themselves)
+    name = "periodic"
+
+class PoissonArrivals: # Bernoulli trial every cycle with probability 1 / rate: geometric gaps of mean rate
+    name = "poisson"
+
+    def attach(self, numSender, seed):
+        self.streams = RandomStreams(numSender, seed, "standard_exponential")
+        self.scales = {} # rate -> mean of the exponential draw giving a geometric gap of mean rate
+
+    def scale(self, rate):
+        if rate not in self.scales:
+            self.scales[rate] = float(scaleOf(np.float64(rate)))
+        return self.scales[rate]
+
+    def nextTime(self, id, time, rate): # next send time of sender id after time
+        return time + max(1, math.ceil(self.streams.take(id) * self.scale(rate)))
+
+    def nextTimes(self, ids, time, rates): # same for the senders ids (NumPy arrays)
+        gaps = np.ceil(self.streams.takeMany(ids) * scaleOf(rates.astype(np.float64)))
+        return time + np.maximum(gaps, 1).astype(np.int64)
+
+def scaleOf(rate): # ceil(exponential * scale) is geometric with success probability 1 / rate (0 for rate 1: gap 1)
+    with np.errstate(divide="ignore"):
+        return -1 / np.log1p(-1 / np.maximum(rate, 1))
+
+class OnOffArrivals: # periodic during on periods, silent during off periods, exponential durations
+    name = "onoff"
+
+    def __init__(self, meanOn=500, meanOff=500):
+        self.meanOn = meanOn # mean length of an on period (cycles)
+        self.meanOff = meanOff # mean length of an off period (cycles)
+
+    def attach(self, numSender, seed):
+        self.streams = RandomStreams(numSender, seed, "standard_exponential")
+        self.onEnd = np.full(numSender, -1, dtype=np.int64) # end of the current on period of each sender (-1: drawn on first use)
+
+    def nextTime(self, id, time, rate):
+        onEnd = int(self.onEnd[id])
+        if onEnd < 0: # first on period starts at cycle 0
+            onEnd = math.ceil(self.streams.take(id) * self.meanOn)
+        nextTime = time + rate if time >= 0 else 0
+        while nextTime >= onEnd: # next on period after an off period
+            onStart = onEnd + math.ceil(self.streams.take(id) * self.meanOff)
+            onEnd = onStart + max(1, math.ceil(self.streams.take(id) * self.meanOn))
+            nextTime = max(nextTime, onStart)
+        self.onEnd[id] = onEnd
+        return nextTime
+
+    def nextTimes(self, ids, time, rates): # same for the senders ids (NumPy arrays)
+        # the off and on periods of the senders past the end of their on period are drawn several pairs at a time:
+        # the ends of the on periods are the cumulative sums of the durations, the first one after the send time
+        # ends the on period it falls in, and the draws after it are left for the next time (as nextTime does)
+        if len(ids) < ON_OFF_VECTOR: # a few senders (the usual case): cheaper one at a time
+            return np.array([self.nextTime(id, time, rate) for id, rate in zip(ids.tolist(), rates.tolist())],
+                dtype=np.int64)
+        onEnd = self.onEnd[ids]
+        first = onEnd < 0
+        if first.any():
+            onEnd[first] = np.ceil(self.streams.takeMany(ids[first]) * self.meanOn)
+        nextTimes = time + rates if time >= 0 else np.zeros(len(ids), dtype=np.int64)
+        past = np.flatnonzero(nextTimes >= onEnd)
+        while len(past):
+            active = ids[past]
+            # enough pairs to cover the furthest send time on average, the few senders still short draw again
+            pairs = int((nextTimes[past] - onEnd[past]).max() // (self.meanOn + self.meanOff)) + 2
+            pairs = min(pairs, self.streams.batch // 2)
+            draws = self.streams.peek(active, 2 * pairs)
+            off = np.ceil(draws[:, 0::2] * self.meanOff).astype(np.int64)
+            on = np.maximum(1, np.ceil(draws[:, 1::2] * self.meanOn)).astype(np.int64)
+            ends = onEnd[past, None] + np.cumsum(off + on, axis=1) # end of each on period drawn
+            after = ends > nextTimes[past, None]
+            used = np.where(after.any(axis=1), after.argmax(axis=1), pairs - 1) # on period of the send (or the last)
+            rows = np.arange(len(past))
+            self.streams.skip(active, 2 * (used + 1))
+            onEnd[past] = ends[rows, used]
+            nextTimes[past] = np.maximum(nextTimes[past], ends[rows, used] - on[rows, used])
+            past = past[nextTimes[past] >= onEnd[past]]
+        self.onEnd[ids] = onEnd
+        return nextTimes
+
+class FixedFlowSize: # every sender sends NUM_PACKET packets (the default)
+    name = "fixed"
+
+class ParetoFlowSize: # heavy tailed flow sizes, Pareto with shape alpha and mean NUM_PACKET
+    name = "pareto"
+
+    def __init__(self, alpha=1.5):
+        self.alpha = alpha
+
+    def sizes(self, numSender, mean, seed): # num of packets of each sender
+        generator = np.random.default_rng(seed)
+        scale = mean * (self.alpha - 1) / self.alpha # minimum size
+        return np.ceil(scale * (1 + generator.pareto(self.alpha, numSender))).astype(np.int64).tolist()
+
+ARRIVALS = {"periodic": PeriodicArrivals, "poisson": PoissonArrivals, "onoff": OnOffArrivals}
+FLOW_SIZES = {"fixed": FixedFlowSize, "pareto": ParetoFlowSize}
+
+def makeProcess(spec, processes): # process from a name, a dict {"process": name, parameters...} or the process itself
+    if isinstance(spec, dict):
+        parameters = dict(spec)
+        name = parameters.pop("process")
+    elif isinstance(spec, str):
+        name = spec
+        parameters = {}
+    else:
+        return spec
+    if name not in processes:
+        raise ValueError("unknown process: %r" % (name,))
+    return processes[name](**parameters)
+
+def makeArrivals(spec):
+    return makeProcess(spec, ARRIVALS)
+
+def makeFlowSize(spec):
+    return makeProcess(spec, FLOW_SIZES)
@@ -0,0 +1,144 @@
+# Benchmark suite
+# Runs template (none), BCN and FECN scenarios at several scales, each in a fresh process, and reports
+# wall time, simulated cycles per second, delivered packets per second and peak RSS.
+# Results are stored as JSON and can be compared against a saved baseline.
+# Every scenario must finish: a run stopped by its time limit (e.g. deadlocked after drops) only measures a
+# stuck simulation, so it fails the benchmark instead of being recorded.
+#
+# usage: python -m netsim.bench --scale small medium --output bench.json
+#        python -m netsim.bench --baseline bench.json --threshold 0.1   (exit code 1 on regression)
+
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import platform
+import sys
+import time as clock
+
+from netsim.config import SimulationConfig
+from netsim.simulation import run_simulation
+
+PROTOCOLS = ("none", "bcn", "fecn")
+# scale -> (num of senders, packets per sender, buffer size, sender backend); buffers of 20 / 2000, total packets
+# 20k / 20k / 1M (200 at the small scale ran in about 2 ms, too short to time)
+SCALES = {
+    "small": (2, 10000, 20, "object"),
+    "medium": (64, 312, 2000, "array"),
+    "large": (1024, 977, 2000, "array"),
+}
+SWITCH_RATE = 10
+DEFAULT_SCALES = ("small", "medium")
+
+def scenarios(scales=DEFAULT_SCALES, protocols=PROTOCOLS): # name -> (protocol, config)
+    result = {}
+    for scale in scales:
+        numSender, numPacket, bufferMax, backend = SCALES[scale]
+        for protocol in protocols:
+            # senders at their fair share of the switch: it is fully loaded and every protocol finishes without
+            # drops in numSender * numPacket * SWITCH_RATE cycles, the time limit (twice that) only guards a deadlock
+            config = SimulationConfig(bufferMax=bufferMax, numSender=numSender, numPacket=numPacket,
+                senderRate=numSender * SWITCH_RATE, switchRate=SWITCH_RATE, senderBackend=backend,
+                traceLevel="summary", timeLimit=2 * SWITCH_RATE * numSender * numPacket)
+            result["%s-%s" % (protocol, scale)] = (protocol, config)
+    return result
+
+def peakRss(): # peak resident set size of this process in bytes
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return rss
+    return rss * 1024
+
+def runScenario(protocol, config): # run one scenario (in its own process)
+    start = clock.perf_counter()
+    result = run_simulation(config, protocol)
+    wallTime = clock.perf_counter() - start
+    return {
+        "protocol": protocol,
+        "numSender": config.numSender,
+        "numPacket": config.numPacket,
+        "bufferMax": config.bufferMax,
+        "senderRate": config.senderRate,
+        "senderBackend": config.senderBackend,
+        "finished": result["finished"],
+        "cycles": result["completionTime"],
+        "delivered": result["received"],
+        "wallTime": wallTime,
+        "cyclesPerSec": result["completionTime"] / wallTime,
+        "packetsPerSec": result["received"] / wallTime,
+        "peakRss": peakRss(),
+    }
+
+def runBenchmarks(names=None, scales=DEFAULT_SCALES, repeat=3, verbose=True):
+    # run the scenarios one at a time, each in a fresh process so peak RSS is its own; best of repeat
+    todo = scenarios(scales)
+    if names:
+        todo = {name: todo[name] for name in names}
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name, (protocol, config) in todo.items():
+        best = None
+        for i in range(repeat):
+            with concurrent.futures.ProcessPoolExecutor(1, mp_context=context) as pool:
+                result = pool.submit(runScenario, protocol, config).result()
+            if not result["finished"]:
+                raise RuntimeError("scenario %s did not finish (stopped at the time limit, cycle %d)"
+                    % (name, result["cycles"]))
+            if best is None or result["wallTime"] < best["wallTime"]:
+                best = result
+        results[name] = best
+        if verbose:
+            print(formatRow(name, best), file=sys.stderr)
+    return {"meta": meta(), "results": results}
+
+def meta():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "date": clock.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+def formatRow(name, result):
+    return "%-14s %9.3fs %12.0f cycles/s %10.0f packets/s %8.1f MB" % (name, result["wallTime"],
+        result["cyclesPerSec"], result["packetsPerSec"], result["peakRss"] / 2 ** 20)
+
+def compare(current, baseline, threshold=0.1):
+    # scenarios whose cycles/s or packets/s dropped by more than threshold (a fraction) from the baseline
+    regressions = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]
+        for metric in ("cyclesPerSec", "packetsPerSec"):
+            if old[metric] > 0 and result[metric] < old[metric] * (1 - threshold):
+                regressions.append((name, metric, old[metric], result[metric]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark the simulations")
+    parser.add_argument("--scale", nargs="+", choices=sorted(SCALES), default=list(DEFAULT_SCALES))
+    parser.add_argument("--scenario", nargs="+", help="run only these scenarios (e.g. bcn-small)")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown against the baseline")
+    args = parser.parse_args(argv)
+    current = runBenchmarks(args.scenario, args.scale, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for name, metric, old, new in regressions:
+            print("REGRESSION %s %s: %.0f -> %.0f (%.1f%%)" % (name, metric, old, new, 100 * (new / old - 1)))
+        if regressions:
+            sys.exit(1)
+        print("no regression against %s (threshold %.0f%%)" % (args.baseline, 100 * args.threshold))
+
+if __name__ == "__main__":
+    main()
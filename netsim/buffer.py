@@ -0,0 +1,50 @@
+# Buffer used in the switch
+# Implemented as a preallocated ring buffer so that push and pop are O(1) no matter how deep the buffer is
+
+class Buffer:
+    def __init__(self, max):
+        self.max = max # max size of the buffer
+        self.element = [None] * max # the slots of the buffer
+        self.head = 0 # index of the oldest element
+        self.size = 0 # the current size of the buffer
+        # statistics
+        self.drops = 0 # num of elements discarded because the buffer is full
+        self.peak = 0 # max size reached
+        self.time = 0 # num of cycles passed
+        self.occupancy = 0 # sum of size over all cycles passed, for the time-weighted mean
+
+    def isEmpty(self):
+        return self.size == 0
+
+    def isFull(self):
+        return self.size == self.max
+
+    def getSize(self):
+        return self.size
+
+    def timePass(self, cycles=1): # the current size is held for the cycles passed
+        self.time += cycles
+        self.occupancy += self.size * cycles
+
+    def push(self, newElement): # return False if the element is dropped
+        if self.size == self.max:
+            self.drops += 1
+            return False
+        self.element[(self.head + self.size) % self.max] = newElement
+        self.size += 1
+        if self.size > self.peak:
+            self.peak = self.size
+        return True
+
+    def pop(self):
+        if self.size > 0:
+            returnElement = self.element[self.head]
+            self.element[self.head] = None # release the reference
+            self.head = (self.head + 1) % self.max
+            self.size -= 1
+            return returnElement
+
+    def meanOccupancy(self): # time-weighted mean size of the buffer
+        if self.time == 0:
+            return self.size
+        return self.occupancy / self.time
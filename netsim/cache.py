@@ -0,0 +1,193 @@
+# Result cache
+# The simulations are deterministic for a given configuration, so the summary of a run is stored in a local
+# SQLite database keyed on a hash of the protocol, every config field and the source of the netsim package
+# (any change to the simulator invalidates the old results). Identical runs are then looked up instead of
+# simulated. A trace written to a file can be stored with the summary (storeTrace) and is written back on a hit,
+# as is the file of the streaming statistics (statsOutput), always stored.
+# The database is kept under maxBytes by dropping the least recently used results.
+#
+#   result = run_simulation(config, "bcn", cache="results.sqlite")
+#
+# Runs with a side effect which can not be replayed (printed trace or statistics, profiling, a trace file
+# without storeTrace) or a config which is not plain data (e.g. a strategy object) are simply run.
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time as clock
+import zlib
+
+from netsim.config import SimulationConfig
+from netsim.topology import Topology
+
+MAX_BYTES = 256 * 1024 * 1024 # default size limit of the database
+PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+_codeVersion = None
+
+def codeVersion(): # hash of the source of the netsim package, computed once per process
+    global _codeVersion
+    if _codeVersion is None:
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(PACKAGE, "*.py"))):
+            digest.update(os.path.basename(path).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        _codeVersion = digest.hexdigest()
+    return _codeVersion
+
+def canonical(config, protocol): # canonical JSON of a run, None if it is not plain data
+    if not isinstance(protocol, str):
+        return None
+    values = config.asDict()
+    if isinstance(values["topology"], Topology):
+        values["topology"] = values["topology"].asDict()
+    try:
+        return json.dumps({"protocol": protocol, "config": values, "code": codeVersion()}, sort_keys=True,
+            separators=(",", ":"), allow_nan=False)
+    except (TypeError, ValueError):
+        return None
+
+def runKey(config, protocol): # key of a run in the cache, None if it can not be cached
+    text = canonical(config, protocol)
+    if text is None:
+        return None
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def traceFiles(path): # files of a trace output: the csv file, or the files of a binary trace directory
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path))
+    return [path]
+
+class ResultCache:
+    def __init__(self, path, maxBytes=MAX_BYTES, storeTrace=False, bypass=False):
+        self.path = path # SQLite database, created if missing
+        self.maxBytes = maxBytes
+        self.storeTrace = storeTrace # store trace files with the summaries (otherwise runs writing one are not cached)
+        self.bypass = bypass # always run (results are still stored, replacing the cached ones)
+        self.hits = 0
+        self.misses = 0
+        with self.connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+                "trace BLOB, size INTEGER NOT NULL, lastUsed REAL NOT NULL)") # trace: output files of the run
+            db.execute("CREATE INDEX IF NOT EXISTS resultsLastUsed ON results (lastUsed)")
+
+    def connect(self): # one connection per use, so worker processes of a sweep can share the database
+        db = sqlite3.connect(self.path, timeout=60)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def isCacheable(self, config):
+        if config.profile or (config.statsInterval is not None and config.statsOutput is None):
+            return False
+        if config.traceLevel == "full":
+            return self.storeTrace and config.traceOutput is not None
+        return True
+
+    def get(self, key): # (summary, output files or None) of a cached run, None on a miss
+        db = self.connect()
+        try:
+            with db:
+                row = db.execute("SELECT summary, trace FROM results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                db.execute("UPDATE results SET lastUsed = ? WHERE key = ?", (clock.time(), key))
+        finally:
+            db.close()
+        summary, trace = row
+        return json.loads(summary), (pickle.loads(zlib.decompress(trace)) if trace is not None else None)
+
+    def put(self, key, summary, files=None): # files: {"trace": name -> bytes, "stats": bytes} of the outputs written
+        text = json.dumps(summary)
+        trace = zlib.compress(pickle.dumps(files, pickle.HIGHEST_PROTOCOL)) if files is not None else None
+        size = len(key) + len(text) + (len(trace) if trace is not None else 0)
+        db = self.connect()
+        try:
+            with db:
+                db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", (key, text, trace, size, clock.time()))
+                self.evict(db)
+        finally:
+            db.close()
+
+    def evict(self, db): # drop the least recently used results until the database fits in maxBytes
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        while total > self.maxBytes:
+            rows = db.execute("SELECT key, size FROM results ORDER BY lastUsed LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                db.execute("DELETE FROM results WHERE key = ?", (key,))
+                total -= size
+                if total <= self.maxBytes:
+                    break
+
+    def clear(self):
+        db = self.connect()
+        try:
+            with db:
+                db.execute("DELETE FROM results")
+        finally:
+            db.close()
+
+    def __len__(self): # num of cached results
+        db = self.connect()
+        try:
+            return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        finally:
+            db.close()
+
+    def run(self, config, protocol): # summary of a run, from the cache if it is there
+        from netsim.simulation import Simulation
+        key = runKey(config, protocol) if self.isCacheable(config) else None
+        if key is None:
+            return Simulation(config, protocol).run()
+        if not self.bypass:
+            cached = self.get(key)
+            if cached is not None:
+                self.hits += 1
+                summary, files = cached
+                if files is not None and "trace" in files:
+                    self.writeTrace(config.traceOutput, files["trace"])
+                if files is not None and "stats" in files:
+                    with open(config.statsOutput, "wb") as f:
+                        f.write(files["stats"])
+                return summary
+        self.misses += 1
+        summary = Simulation(config, protocol).run()
+        files = {}
+        if config.traceLevel == "full":
+            files["trace"] = {}
+            for path in traceFiles(config.traceOutput):
+                with open(path, "rb") as f:
+                    files["trace"][os.path.basename(path)] = f.read()
+        if config.statsInterval is not None: # statsOutput, isCacheable
+            with open(config.statsOutput, "rb") as f:
+                files["stats"] = f.read()
+        self.put(key, summary, files or None)
+        return json.loads(json.dumps(summary)) # same types as a hit
+
+    def writeTrace(self, output, files):
+        if output.endswith(".csv"):
+            directory = os.path.dirname(output)
+            files = {os.path.basename(output): files[next(iter(files))]}
+        else:
+            directory = output
+            os.makedirs(directory, exist_ok=True)
+        for name, data in files.items():
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(data)
+
+def makeCache(cache): # ResultCache from a path, or the cache itself
+    if isinstance(cache, str):
+        return ResultCache(cache)
+    return cache
+
+def cachedRun(config, protocol, cache):
+    if config is None:
+        config = SimulationConfig()
+    elif isinstance(config, dict):
+        config = SimulationConfig(**config)
+    return makeCache(cache).run(config, protocol)
@@ -0,0 +1,53 @@
+# Checkpoint/restore of simulations
+# snapshot(simulation) saves the whole state (switch buffers, senders with their timers, receiver counters,
+# congestion control state, event queue and time) as compressed bytes. restore() continues the run from there,
+# fork() makes variants of a warmed-up simulation with some parameters changed.
+# A trace written to a file stays with the original simulation, restored ones keep its totals only.
+
+import pickle
+import zlib
+
+# config fields which can be changed in the middle of a run (besides the parameters of the congestion control)
+FORKABLE = ("timeLimit", "window", "traceFormat")
+
+def snapshot(simulation, level=6): # compressed state of a simulation, between two events
+    if simulation.metrics is not None:
+        raise ValueError("cannot snapshot a profiled simulation")
+    return zlib.compress(pickle.dumps(simulation, pickle.HIGHEST_PROTOCOL), level)
+
+def restore(data): # simulation from a snapshot, ready to continue (e.g. with run())
+    return pickle.loads(zlib.decompress(data))
+
+def save(simulation, path):
+    with open(path, "wb") as f:
+        f.write(snapshot(simulation))
+
+def load(path):
+    with open(path, "rb") as f:
+        return restore(f.read())
+
+def fork(data, **changes):
+    # simulation from a snapshot with some parameters changed: config fields in FORKABLE, or parameters of the
+    # congestion control (e.g. weight, decreaseFactor for BCN, tInterval for FECN, from its next update)
+    simulation = restore(data)
+    control = simulation.control
+    configChanges = {}
+    for name, value in changes.items():
+        if name in control.parameters:
+            setattr(control, name, value)
+        elif name not in FORKABLE:
+            raise ValueError("cannot change %s in the middle of a run" % name)
+        if name in vars(simulation.config):
+            configChanges[name] = value
+    simulation.config = simulation.config.copy(**configChanges)
+    if "window" in changes:
+        for sender in simulation.senders:
+            sender.window = changes["window"]
+        if simulation.population is not None:
+            simulation.population.window = changes["window"]
+    if "traceFormat" in changes and hasattr(simulation.trace, "format"):
+        simulation.trace.format = changes["traceFormat"]
+    return simulation
+
+def runForks(data, variants): # run a fork of the snapshot for each dict of changes, returns their summaries
+    return [fork(data, **changes).run() for changes in variants]
@@ -0,0 +1,98 @@
+# Configuration of a simulation
+# The constants at the bottom of template.py, bcn.py and fecn.py, in camelCase
+
+from netsim.trace import CSV_FORMAT
+
+# names of the constants in the scripts (and sweep points) -> config fields
+CONSTANTS = {
+    "BUFFER_MAX": "bufferMax",
+    "NUM_SENDER": "numSender",
+    "NUM_PACKET": "numPacket",
+    "WINDOW": "window",
+    "SENDER_RATE": "senderRate",
+    "SWITCH_RATE": "switchRate",
+    "T_INTERVAL": "tInterval",
+    "SENDER_BACKEND": "senderBackend",
+    "TRACE_LEVEL": "traceLevel",
+    "TRACE_OUTPUT": "traceOutput",
+    "TIME_LIMIT": "timeLimit",
+    "PROFILE": "profile",
+    "TOPOLOGY": "topology",
+    "ARRIVALS": "arrivals",
+    "FLOW_SIZE": "flowSize",
+    "SEED": "seed",
+    "FAST_FORWARD": "fastForward",
+    "STATS_INTERVAL": "statsInterval",
+    "STATS_OUTPUT": "statsOutput",
+    "CONVERGENCE": "convergence",
+    "LINK_DELAY": "linkDelay",
+    "ACK_DELAY": "ackDelay",
+    "FEEDBACK_DELAY": "feedbackDelay",
+    "RATE_DIVISIONS": "rateDivisions",
+}
+
+class SimulationConfig:
+    def __init__(self, bufferMax=20, numSender=2, numPacket=200, window=50, senderRate=10, switchRate=10,
+            tInterval=200, senderBackend="object", traceLevel="full", traceOutput=None, traceFormat=CSV_FORMAT,
+            timeLimit=None, profile=False, topology=None, arrivals="periodic", flowSize="fixed", seed=0,
+            fastForward=False, statsInterval=None, statsOutput=None,
+            convergence=None, linkDelay=0, ackDelay=0, feedbackDelay=0, rateDivisions=1):
+        self.bufferMax = bufferMax # size of the switch buffer
+        self.numSender = numSender # num of senders
+        self.numPacket = numPacket # num of packets to send by each sender
+        self.window = window # time to wait before timeout
+        self.senderRate = senderRate # default rate of senders
+        self.switchRate = switchRate # default rate of switch
+        self.tInterval = tInterval # FECN: cycles between advertised rate updates
+        self.senderBackend = senderBackend # "object": one Sender each, "array": vectorized SenderPopulation (needs NumPy)
+        self.traceLevel = traceLevel # "off": no trace, "summary": totals only, "full": every received packet
+        self.traceOutput = traceOutput # for "full", None: print, "*.csv": text file, a directory of binary columns or a dict of arrays
+        self.traceFormat = traceFormat # format of the printed trace lines
+        self.timeLimit = timeLimit # stop after this many cycles even if not finished, None for no limit
+        self.profile = profile # count calls and time spent per component (netsim.metrics)
+        # None: one switch (bufferMax, switchRate) for numSender senders, otherwise a netsim.topology.Topology
+        # or its dict description, which sets the switches and the num of senders
+        self.topology = topology
+        # random traffic (netsim.arrivals, needs NumPy), a name, a dict {"process": name, parameters...} or an object
+        self.arrivals = arrivals # "periodic": every rate cycles, "poisson", "onoff": bursts
+        self.flowSize = flowSize # num of packets of each sender, "fixed": numPacket, "pareto": heavy tailed with mean numPacket
+        self.seed = seed # seed of the random traffic
+        self.fastForward = fastForward # skip whole periods once the run repeats itself (netsim.steadystate)
+        self.statsInterval = statsInterval # cycles between records of the streaming statistics (netsim.stats), None for none
+        self.statsOutput = statsOutput # None: print the records, otherwise a file of JSON lines
+        # stop once converged (netsim.convergence), None: run until every packet is ACKed, "band" or "batchMeans",
+        # or a dict {"criterion": name, parameters...}
+        self.convergence = convergence
+        # propagation delays (cycles, netsim.delay)
+        self.linkDelay = linkDelay # from a switch to the next hop (or the receiver), per link in a topology
+        self.ackDelay = ackDelay # from the receiver back to the sender
+        self.feedbackDelay = feedbackDelay # BCN messages from a switch to the senders
+        # rates are multiples of 1 / rateDivisions cycle (a power of 2), 1: integer rates, > 1: fractional rates
+        # on a virtual clock (netsim.engine.nextSlot), object sender backend only
+        self.rateDivisions = rateDivisions
+
+    def asDict(self):
+        return dict(vars(self))
+
+    def copy(self, **changes): # a new config with some fields changed
+        values = self.asDict()
+        for name in changes:
+            if name not in values:
+                raise ValueError("unknown config field: %s" % name)
+        values.update(changes)
+        return SimulationConfig(**values)
+
+    @staticmethod
+    def fromConstants(constants): # config from script constant names, e.g. {"BUFFER_MAX": 20}
+        values = {}
+        for name, value in constants.items():
+            if name not in CONSTANTS:
+                raise ValueError("unknown constant: %s" % name)
+            values[CONSTANTS[name]] = value
+        return SimulationConfig(**values)
+
+    def __eq__(self, other):
+        return isinstance(other, SimulationConfig) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return "SimulationConfig(%s)" % ", ".join("%s=%r" % item for item in vars(self).items())
@@ -0,0 +1,299 @@
+# Congestion control strategies
+# A strategy holds its own state and is called by the simulation at these points:
+#   canSend(sender)                                  sender (None: all senders) is allowed to send in this cycle
+#   afterSend(sender, packet, time)                  a ready sender has sent packet (None if it had nothing to send)
+#   afterPopulationSend(population, ids, packets, time)  same for the senders ids of a SenderPopulation
+#   onReceive(switch, packet)                        packet enters the switch (every hop of its route)
+#   onRelay(switch, packet, time)                    switch relays packet to the next switch or the receiver
+#   onAck(sender, packet, time)                      the ACK of packet reaches its sender
+#   onPopulationAck(population, id, packet, time)    same for sender id of a SenderPopulation
+#   onFeedback(message, time)                        message put on simulation.feedbackLine reaches the senders
+#   update(time)                                     every interval cycles from cycle 0 (interval None: never)
+
+import enum
+import math
+from fractions import Fraction
+
+from netsim.engine import quantizeRate
+
+class BcnMessage(enum.Enum):
+    NORMAL = 0 # BCN normal message
+    STOP = 1   # BCN stop message
+    NIL = 2    # no BCN message sent
+
+class NoControl: # no congestion control (template)
+    name = "none"
+    ackEveryPacket = False # receiver counts ACKs of in-order packets only
+    interval = None # period of update()
+    parameters = () # attributes which can be changed in the middle of a run (netsim.checkpoint.fork)
+    counters = () # attributes which only count (moved on in closed form by netsim.steadystate)
+
+    def attach(self, simulation): # called once the switch and senders of the simulation are created
+        self.simulation = simulation
+        self.divisions = simulation.config.rateDivisions # new rates are rounded to multiples of 1 / divisions
+
+    def canSend(self, sender=None):
+        return True
+
+    def afterSend(self, sender, packet, time):
+        pass
+
+    def afterPopulationSend(self, population, ids, packets, time):
+        pass
+
+    def onReceive(self, switch, packet):
+        pass
+
+    def onRelay(self, switch, packet, time):
+        pass
+
+    def onAck(self, sender, packet, time):
+        pass
+
+    def onPopulationAck(self, population, id, packet, time):
+        pass
+
+    def onFeedback(self, message, time):
+        pass
+
+    def update(self, time):
+        pass
+
+    def fingerprint(self): # state which decides what happens next (netsim.steadystate)
+        return ()
+
+    def watched(self): # name -> values which settle once the control converges (netsim.convergence)
+        return {}
+
+    def state(self): # current protocol state for live snapshots (netsim.live)
+        return self.watched()
+
+    def summary(self): # protocol specific summary metrics
+        return {}
+
+class CongestionPoint: # BCN state of one switch
+    def __init__(self, qEq, qSc):
+        self.qEq = qEq # equilibrium length
+        self.qSc = qSc # severe congestion length
+        self.prevSize = 0 # the previous size of buffer
+        self.congestionMeasure = 0 # last congestion measure sampled
+        self.message = BcnMessage.NIL # last BCN message sent
+
+class BcnFeedback: # BCN message followed by the senders of a route
+    def __init__(self):
+        self.point = None # congestion point which sent it
+        self.congestionMeasure = 0
+        self.message = BcnMessage.NIL
+
+def severity(message, congestionMeasure): # stop > slow down > no message > speed up
+    if message == BcnMessage.STOP:
+        return math.inf
+    if message == BcnMessage.NORMAL:
+        return -congestionMeasure
+    return 0
+
+class BcnControl(NoControl): # BCN (on top of TCP)
+    # every switch is a congestion point, its message goes to the senders of the route of the sampled packet
+    # (with one switch: to every sender), a route follows the most severe congestion point until it clears
+    name = "bcn"
+    ackEveryPacket = True
+
+    parameters = ("weight", "decreaseFactor")
+    counters = ("overhead",)
+
+    def __init__(self, weight=1, eqFraction=0.25, scFraction=0.75, decreaseFactor=40):
+        self.weight = weight # the weight of qDelta in congestion measure
+        self.eqFraction = eqFraction # equilibrium length, as a fraction of the buffer
+        self.scFraction = scFraction # severe congestion length, as a fraction of the buffer
+        self.decreaseFactor = decreaseFactor # rate decrease is rate * (1 - congestionMeasure / decreaseFactor)
+
+    def attach(self, simulation):
+        NoControl.attach(self, simulation)
+        self.defaultRate = simulation.config.senderRate # senders above it are rate limited (tagged)
+        self.points = {} # switch -> CongestionPoint
+        for switch in simulation.switches:
+            max = switch.buffer.max
+            self.points[switch] = CongestionPoint(round(max * self.eqFraction), round(max * self.scFraction))
+        self.feedback = [] # sender id -> BcnFeedback of its route
+        routes = {}
+        for path in simulation.paths:
+            if id(path) not in routes:
+                routes[id(path)] = BcnFeedback()
+            self.feedback.append(routes[id(path)])
+        self.overhead = 0 # counting the number of bcn signal sent
+
+    def canSend(self, sender=None): # bcn message != stop (population runs have one switch, so one route)
+        feedback = self.feedback[0 if sender is None else sender.id]
+        return feedback.message != BcnMessage.STOP
+
+    def afterSend(self, sender, packet, time):
+        if packet is not None: # rate limited tag
+            packet.tagged = packet.rate > self.defaultRate
+        feedback = self.feedback[sender.id]
+        if feedback.message == BcnMessage.NORMAL:
+            self.rateUpdate(sender, feedback.congestionMeasure)
+
+    def afterPopulationSend(self, population, ids, packets, time):
+        for packet in packets:
+            packet.tagged = packet.rate > self.defaultRate
+        feedback = self.feedback[0]
+        if feedback.message == BcnMessage.NORMAL:
+            population.rateUpdate(ids, feedback.congestionMeasure, self.decreaseFactor)
+
+    def rateUpdate(self, sender, congestionMeasure): # update the rate using Congestion measure and AIMD algorithm
+        if congestionMeasure < 0: # decrease rate (increase in number)
+            sender.rate = quantizeRate(sender.rate * (1 - congestionMeasure / self.decreaseFactor), self.divisions)
+        if congestionMeasure > 0: # increase rate (decrease in number)
+            newRate = quantizeRate(sender.rate - congestionMeasure, self.divisions) # weight may be fractional
+            if newRate <= 0:
+                sender.rate = 1
+            else:
+                sender.rate = newRate
+
+    def onRelay(self, switch, packet, time):
+        point = self.points[switch]
+        point.congestionMeasure = self.measure(point, switch.bufferSize()) # sampling for BCN
+        point.message = self.sendBcnMessage(point, switch.bufferSize(), packet) # send the bcn signal
+        self.overhead += 1
+        point.prevSize = switch.bufferSize() # update prevSize
+        feedback = self.feedback[packet.sender] # signal the senders of the route of the sampled packet
+        if self.simulation.feedbackLine is None:
+            self.signal(feedback, point, point.congestionMeasure, point.message)
+        else: # reaches them after the feedback delay
+            self.simulation.delay(self.simulation.feedbackLine, time,
+                (feedback, point, point.congestionMeasure, point.message))
+
+    def signal(self, feedback, point, congestionMeasure, message): # message of point reaches the senders of a route
+        if feedback.point is point or severity(message, congestionMeasure) >= severity(feedback.message,
+                feedback.congestionMeasure):
+            feedback.point = point
+            feedback.congestionMeasure = congestionMeasure
+            feedback.message = message
+
+    def onFeedback(self, message, time):
+        self.signal(*message)
+
+    def measure(self, point, size): # ei = qOff - weight * qDelta
+        qOff = point.qEq - size
+        qDelta = point.prevSize - size
+        return qOff - self.weight * qDelta
+
+    def sendBcnMessage(self, point, size, packet):
+        if size <= point.qEq:
+            if packet.tagged:
+                return BcnMessage.NORMAL
+            else:
+                return BcnMessage.NIL
+        if size <= point.qSc:
+            return BcnMessage.NORMAL
+        return BcnMessage.STOP
+
+    def fingerprint(self):
+        points = list(self.points.values())
+        index = dict((id(point), i) for i, point in enumerate(points))
+        return (tuple((point.prevSize, point.congestionMeasure, point.message) for point in points),
+            tuple((index.get(id(feedback.point)), feedback.congestionMeasure, feedback.message) for feedback in self.feedback))
+
+    def watched(self):
+        return {"congestionMeasure": [point.congestionMeasure for point in self.points.values()]}
+
+    def state(self):
+        points = self.points.values()
+        return {"congestionMeasure": [point.congestionMeasure for point in points],
+            "message": [point.message.name for point in points], "bcnSent": self.overhead}
+
+    def summary(self):
+        return {"bcnSent": self.overhead}
+
+class FecnControl(NoControl): # FECN
+    # every switch advertises a rate for the flows through it, the RD tag keeps the most restrictive on the route
+    name = "fecn"
+
+    parameters = ("tInterval",)
+
+    def __init__(self, tInterval=None):
+        self.tInterval = tInterval # cycles between advertised rate updates, None to use the config
+
+    @property
+    def interval(self):
+        return self.tInterval
+
+    def attach(self, simulation):
+        NoControl.attach(self, simulation)
+        if self.tInterval is None:
+            self.tInterval = simulation.config.tInterval
+        self.paths = simulation.paths
+        # num of senders at each rate per switch, kept up to date as the RD tags change the rates so that the
+        # aggregate arrival rate (sum of 1/rate) costs O(distinct rates) per interval instead of O(N^2) per update
+        self.rateCount = {}
+        for switch in simulation.switches:
+            self.rateCount[switch] = {}
+        for id, rate in enumerate(simulation.senderRates()):
+            for switch in self.paths[id]:
+                self.rateCount[switch][rate] = self.rateCount[switch].get(rate, 0) + 1
+        self.advertised = {} # switch -> advertised rate, r0 = C / N0 with N0 the flows through the switch
+        for switch in simulation.switches:
+            self.advertised[switch] = switch.rate * sum(self.rateCount[switch].values())
+        self.advertisedRate = self.advertised[simulation.switch] # of the first switch, the only one usually
+
+    def changeRate(self, id, old, new): # sender id changes from rate old to new
+        if old == new:
+            return
+        for switch in self.paths[id]:
+            rateCount = self.rateCount[switch]
+            count = rateCount[old] - 1
+            if count:
+                rateCount[old] = count
+            else:
+                del rateCount[old]
+            rateCount[new] = rateCount.get(new, 0) + 1
+
+    def onReceive(self, switch, packet): # RD tag carries the most restrictive advertised rate on the path
+        packet.rd = max(packet.rd, self.advertised[switch])
+
+    def onAck(self, sender, packet, time): # adjust the rate according to RD tag
+        if packet.rd > 0:
+            self.changeRate(sender.id, sender.rate, packet.rd)
+            sender.rate = packet.rd
+
+    def onPopulationAck(self, population, id, packet, time):
+        if packet.rd > 0:
+            self.changeRate(id, int(population.rate[id]), packet.rd)
+        population.handleRDTag(id, packet.rd, time)
+
+    def arrivalRate(self, switch): # aggregate rate of the senders through switch, 1 / sum(1 / rate), in cycles per packet
+        # exact sum of fractions, so the result is the correctly rounded value of the product formula
+        # (prod(rate) / sum of the products without each rate) without its overflow at many senders
+        inverseSum = sum(Fraction(count) / Fraction(rate) for rate, count in self.rateCount[switch].items())
+        return float(1 / inverseSum)
+
+    def update(self, time): # update the advertised rate of the switches
+        for switch in self.advertised:
+            if self.rateCount[switch]: # switches no flow goes through keep their rate
+                effectiveLoadFactor = switch.rate / self.arrivalRate(switch)
+                self.advertised[switch] = quantizeRate(self.advertised[switch] * effectiveLoadFactor, self.divisions)
+        self.advertisedRate = self.advertised[self.simulation.switch]
+
+    def fingerprint(self):
+        return tuple(self.advertised.values())
+
+    def watched(self):
+        return {"advertisedRate": [rate for switch, rate in self.advertised.items() if self.rateCount[switch]]}
+
+    def state(self):
+        return {"advertisedRate": list(self.advertised.values())}
+
+    def summary(self):
+        result = {"advertisedRate": self.advertisedRate}
+        if len(self.advertised) > 1:
+            result["advertisedRates"] = dict((switch.name, rate) for switch, rate in self.advertised.items())
+        return result
+
+CONTROLS = {"none": NoControl, "template": NoControl, "bcn": BcnControl, "fecn": FecnControl}
+
+def makeControl(protocol): # strategy for a protocol name ("none"/"template", "bcn", "fecn"), or the strategy itself
+    if isinstance(protocol, str):
+        if protocol not in CONTROLS:
+            raise ValueError("unknown protocol: %r" % (protocol,))
+        return CONTROLS[protocol]()
+    return protocol
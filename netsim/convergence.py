@@ -0,0 +1,131 @@
+# Convergence-based early termination
+# A stop criterion is checked every `interval` cycles (the control interval by default, e.g. T_INTERVAL for
+# FECN). Once it holds, the run ends before every packet is ACKed and the summary reports the converged values.
+#   "band"       : the watched values (sender rates, the time-weighted queue of every switch, and what the
+#                  control watches: BCN congestion measures, FECN advertised rates) all stay within a
+#                  tolerance band for `intervals` checks in a row, and every sender with packets left has sent
+#                  during them (a window shorter than the period of the slowest sender only sees that nothing happens)
+#   "batchMeans" : the throughput of each interval is a batch, stop once the confidence interval of its mean
+#                  (after `warmup` batches) is narrower than `precision` times the mean
+# A criterion is given by name, by a dict {"criterion": name, parameters...} or as an object.
+
+import statistics
+from collections import deque
+
+from netsim.stats import tQuantile
+
+DEFAULT_INTERVAL = 200 # cycles between checks when the control has no interval (none, BCN)
+
+class ToleranceBand:
+    name = "band"
+
+    def __init__(self, tolerance=0.05, intervals=10, interval=None):
+        self.tolerance = tolerance # relative width of the band (absolute below 1)
+        self.intervals = intervals # num of checks in a row the values stay in the band
+        self.interval = interval # cycles between checks, None for the control interval
+
+    def attach(self, simulation):
+        self.simulation = simulation
+        if self.interval is None:
+            self.interval = simulation.control.interval or DEFAULT_INTERVAL
+        self.history = deque(maxlen=self.intervals) # watched values of the last checks
+        self.sent = deque(maxlen=self.intervals) # packets sent by each sender at the last checks
+        self.occupancy = [switch.buffer.occupancy for switch in simulation.switches]
+        self.last = 0 # time of the last check
+
+    def watched(self, time): # name -> values at this check
+        simulation = self.simulation
+        values = {"rate": simulation.senderRates()}
+        queues = []
+        length = time - self.last
+        for i in range(len(simulation.switches)):
+            switch = simulation.switches[i]
+            switch.timePass(time - switch.time)
+            occupancy = switch.buffer.occupancy
+            queues.append((occupancy - self.occupancy[i]) / length if length > 0 else switch.buffer.size)
+            self.occupancy[i] = occupancy
+        values["queue"] = queues # mean size since the last check
+        values.update(simulation.control.watched())
+        self.last = time
+        return values
+
+    def inBand(self, series): # values of one element at the checks stay within the band
+        low = min(series)
+        high = max(series)
+        return high - low <= self.tolerance * max(abs(low), abs(high), 1)
+
+    def isActive(self): # every sender with packets left sent since the first check of the band
+        receiver = self.simulation.receiver
+        first = self.sent[0]
+        last = self.sent[-1]
+        return all(last[id] > first[id] for id in range(len(last)) if receiver.ackCounter[id] < receiver.numPacket[id])
+
+    def check(self, time): # True once converged
+        self.history.append(self.watched(time))
+        self.sent.append(self.simulation.senderSent())
+        if len(self.history) < self.intervals or not self.isActive():
+            return False
+        for name in self.history[0]:
+            for i in range(len(self.history[0][name])):
+                if not self.inBand([values[name][i] for values in self.history]):
+                    return False
+        return True
+
+    def converged(self): # mean of each watched value over the band
+        result = {}
+        for name in self.history[0]:
+            means = [statistics.fmean(values[name][i] for values in self.history) for i in range(len(self.history[0][name]))]
+            result[name] = means[0] if len(means) == 1 else means
+        return result
+
+class BatchMeans:
+    name = "batchMeans"
+
+    def __init__(self, precision=0.05, confidence=0.95, batches=10, warmup=1, interval=None):
+        self.precision = precision # half width of the confidence interval relative to the mean
+        self.confidence = confidence
+        self.batches = batches # min num of batches
+        self.warmup = warmup # first batches left out (transient)
+        self.interval = interval # cycles per batch, None for the control interval
+
+    def attach(self, simulation):
+        self.simulation = simulation
+        if self.interval is None:
+            self.interval = simulation.control.interval or DEFAULT_INTERVAL
+        self.throughput = [] # packets ACKed per cycle in each batch after the warmup
+        self.seen = 0 # num of batches
+        self.acked = 0 # packets ACKed at the last check
+
+    def check(self, time):
+        acked = sum(self.simulation.receiver.ackCounter)
+        throughput = (acked - self.acked) / self.interval
+        self.acked = acked
+        self.seen += 1
+        if self.seen <= self.warmup:
+            return False
+        self.throughput.append(throughput)
+        n = len(self.throughput)
+        if n < self.batches:
+            return False
+        mean = statistics.fmean(self.throughput)
+        self.halfWidth = tQuantile(0.5 + self.confidence / 2, n - 1) * statistics.stdev(self.throughput) / n ** 0.5
+        return mean > 0 and self.halfWidth <= self.precision * mean
+
+    def converged(self):
+        return {"throughput": statistics.fmean(self.throughput), "throughputCi": self.halfWidth,
+            "batches": len(self.throughput)}
+
+CRITERIA = {"band": ToleranceBand, "batchMeans": BatchMeans}
+
+def makeCriterion(spec): # criterion from a name, a dict {"criterion": name, parameters...} or the criterion itself
+    if isinstance(spec, dict):
+        parameters = dict(spec)
+        name = parameters.pop("criterion")
+    elif isinstance(spec, str):
+        name = spec
+        parameters = {}
+    else:
+        return spec
+    if name not in CRITERIA:
+        raise ValueError("unknown convergence criterion: %r" % (name,))
+    return CRITERIA[name](**parameters)
@@ -0,0 +1,59 @@
+# Cross-check of the sender backends (needs NumPy)
+# The object backend (one Sender each) and the array backend (netsim.population) must give identical runs.
+# This runs random single-switch configurations on both, with random arrivals and flow sizes as well as
+# periodic senders, and reports every summary metric which differs.
+#
+# usage: python -m netsim.crosscheck --runs 40 --seed 0      (exit code 1 on a mismatch)
+
+import argparse
+import random
+import sys
+
+from netsim.config import SimulationConfig
+from netsim.simulation import run_simulation
+
+PROTOCOLS = ("none", "bcn", "fecn")
+ARRIVALS = ("poisson", "onoff", "periodic")
+FLOW_SIZES = ("fixed", "pareto")
+
+def randomConfig(rng): # (protocol, values of a SimulationConfig) of a random run
+    protocol = rng.choice(PROTOCOLS)
+    values = {"numSender": rng.randint(2, 16), "numPacket": rng.randint(20, 300), "bufferMax": rng.randint(20, 400),
+        "senderRate": rng.randint(2, 40), "switchRate": rng.randint(1, 10), "arrivals": rng.choice(ARRIVALS),
+        "flowSize": rng.choice(FLOW_SIZES), "seed": rng.randrange(1 << 16), "traceLevel": "summary",
+        "timeLimit": 100000} # runs which drop packets deadlock (no retransmission)
+    return protocol, values
+
+def differences(protocol, values): # metrics whose values differ between the backends, as (name, object, array)
+    object = run_simulation(SimulationConfig(senderBackend="object", **values), protocol)
+    array = run_simulation(SimulationConfig(senderBackend="array", **values), protocol)
+    return [(name, object.get(name), array.get(name)) for name in sorted(set(object) | set(array))
+        if object.get(name) != array.get(name)]
+
+def crossCheck(runs=40, seed=0, verbose=True): # num of runs which differ
+    rng = random.Random(seed)
+    mismatches = 0
+    for i in range(runs):
+        protocol, values = randomConfig(rng)
+        diff = differences(protocol, values)
+        if diff:
+            mismatches += 1
+            if verbose:
+                print("MISMATCH %s %s" % (protocol, values))
+                for name, object, array in diff:
+                    print("  %s: object %r, array %r" % (name, object, array))
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="check that both sender backends give the same runs")
+    parser.add_argument("--runs", type=int, default=40, help="num of random configurations")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the configurations")
+    args = parser.parse_args(argv)
+    mismatches = crossCheck(args.runs, args.seed)
+    if mismatches:
+        print("%d of %d runs differ between the sender backends" % (mismatches, args.runs))
+        sys.exit(1)
+    print("%d runs identical on both sender backends" % args.runs)
+
+if __name__ == "__main__":
+    main()
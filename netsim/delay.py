@@ -0,0 +1,31 @@
+# Delay lines for propagation delays
+# Everything sent on a line arrives `delay` cycles later, in the order it was sent, so a line is a FIFO of
+# (arrival time, item): O(1) per item whatever the delay, and the event queue only holds the next arrival of
+# each line (event ARRIVE, index = line id) instead of one event per item in flight.
+
+from collections import deque
+
+class DelayLine:
+    def __init__(self, id, delay, handler):
+        self.id = id # index of the line in the simulation, index of its ARRIVE event
+        self.delay = delay # cycles from one end to the other
+        self.handler = handler # called with (item, time) when an item arrives
+        self.items = deque() # (arrival time, item), oldest first
+
+    def __len__(self): # num of items in flight
+        return len(self.items)
+
+    def push(self, time, item): # send item at time, returns True if the line was empty (its arrival is to be scheduled)
+        empty = not self.items
+        self.items.append((time + self.delay, item))
+        return empty
+
+    def nextTime(self): # arrival time of the oldest item, None if the line is empty
+        if self.items:
+            return self.items[0][0]
+        return None
+
+    def arrive(self, time): # hand the items arriving at time to the handler
+        items = self.items
+        while items and items[0][0] <= time:
+            self.handler(items.popleft()[1], time)
@@ -0,0 +1,76 @@
+# Event queue used to drive the simulations
+# Instead of advancing the clock one cycle at a time, the main program jumps straight to
+# the next cycle where a send, relay or control update is due
+# Used for ELEC4848 FYP
+
+import heapq
+import math
+
+# kinds of events, also the order in which they happen within the same cycle
+# (same order as the old per-tick loop)
+ARRIVE = 0  # items of a delay line reach its end (netsim.delay, index = line id), first thing in the cycle
+RELAY = 1   # switch relays a packet to the receiver (index = link id)
+SEND = 2    # a sender is ready according to its rate regulator (index = sender id)
+CONTROL = 3 # control update at the end of the cycle (e.g. FECN advertised rate)
+STATS = 4   # record of the streaming statistics (netsim.stats), after everything else
+CHECK = 5   # check of the convergence criterion (netsim.convergence)
+
+def nextMultiple(time, rate): # first cycle at or after time where cycle % rate == 0
+    return -(-time // rate) * rate
+
+# fractional rates (config.rateDivisions > 1): a virtual clock where send k of a rate regulator is due at
+# k * rate, in the cycle it falls in, so a rate of 2.5 sends at 0, 3, 5, 8, 10, ... (the same cycles as
+# nextMultiple for integer rates). Rates are multiples of 1 / rateDivisions, a power of 2, so they are exact floats.
+def nextSlot(time, rate): # first cycle at or after time holding a multiple of rate (cycle - 1 < k * rate <= cycle)
+    return math.ceil(((time - 1) // rate + 1) * rate)
+
+def quantizeRate(rate, divisions=1): # rate rounded to a multiple of 1 / divisions (an int if it is whole)
+    if divisions == 1:
+        return round(rate)
+    rate = round(rate * divisions) / divisions
+    return int(rate) if rate.is_integer() else rate
+
+class EventQueue:
+    def __init__(self):
+        self.heap = [] # min-heap of (time, kind, index)
+        self.pending = {} # (kind, index) -> time the event is scheduled for
+        # an event can only be scheduled once, entries in the heap which do not match
+        # pending are stale (rescheduled or cancelled) and are skipped when popping
+
+    def schedule(self, time, kind, index=0): # schedule an event, replacing any earlier schedule of it
+        key = (kind, index)
+        if self.pending.get(key) != time:
+            self.pending[key] = time
+            heapq.heappush(self.heap, (time, kind, index))
+
+    def scheduleBefore(self, time, kind, index=0): # schedule an event unless it is already scheduled earlier
+        scheduled = self.pending.get((kind, index))
+        if scheduled is None or time < scheduled:
+            self.schedule(time, kind, index)
+
+    def cancel(self, kind, index=0):
+        self.pending.pop((kind, index), None)
+
+    def isScheduled(self, kind, index=0):
+        return (kind, index) in self.pending
+
+    def discardStale(self):
+        heap = self.heap
+        pending = self.pending
+        while heap and pending.get((heap[0][1], heap[0][2])) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def isEmpty(self):
+        return len(self.pending) == 0
+
+    def nextTime(self): # time of the earliest event, None if nothing is scheduled
+        self.discardStale()
+        if self.heap:
+            return self.heap[0][0]
+        return None
+
+    def pop(self): # remove and return the earliest event as (time, kind, index)
+        self.discardStale()
+        event = heapq.heappop(self.heap)
+        del self.pending[(event[1], event[2])]
+        return event
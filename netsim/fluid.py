@@ -0,0 +1,119 @@
+# Fluid model of the switch queue and the sender rates, to pre-screen BCN and FECN parameters (needs NumPy)
+# Packets are a fluid: N identical senders each send 1 / rate packets per cycle, the switch serves
+# 1 / switchRate while its queue q is not empty, and the queue is held between 0 and bufferMax (the excess
+# is dropped). The control follows netsim.control with its samples and updates spread over time:
+#   BCN : every relay samples cm = (qEq - q) - weight * qDelta with qDelta = prevSize - q = -switchRate * dq/dt,
+#         a NORMAL message changes the rate at every send by -rate * cm / decreaseFactor (cm < 0) or by -cm
+#         (cm > 0, rate >= 1), so d rate/dt = -cm / decreaseFactor or -cm / rate; STOP stops the senders
+#         (a decrease rounded to no change is dropped, as the integer rates of the packet level do)
+#   FECN: every tInterval cycles advertised = round(advertised * switchRate / (rate / N)), the senders take the
+#         advertised rate (when > 0) once the packets tagged with it are ACKed, a queueing delay later
+# Every parameter can be an array: they are broadcast together and integrated at once (Euler steps of dt),
+# so thousands of points cost about as much as one. The packet level simulation is then only run where
+# the estimate is interesting (e.g. small oscillation, fast convergence).
+#
+#   axes = grid(bufferMax=[20, 40, 80], weight=[0.5, 1, 2], decreaseFactor=[20, 40, 80])
+#   result = estimate("bcn", **axes) # arrays of shape (3, 3, 3)
+
+import numpy as np
+
+DEFAULTS = {"bufferMax": 20, "numSender": 2, "senderRate": 10, "switchRate": 10, "tInterval": 200, "weight": 1,
+    "eqFraction": 0.25, "scFraction": 0.75, "decreaseFactor": 40}
+PARAMETERS = {"none": ("bufferMax", "numSender", "senderRate", "switchRate"),
+    "bcn": ("bufferMax", "numSender", "senderRate", "switchRate", "weight", "eqFraction", "scFraction", "decreaseFactor"),
+    "fecn": ("bufferMax", "numSender", "senderRate", "switchRate", "tInterval")}
+
+def grid(**axes): # every combination of the values of axes, as arrays broadcast against each other
+    names = list(axes)
+    arrays = np.meshgrid(*[np.asarray(axes[name], dtype=float) for name in names], indexing="ij")
+    return dict(zip(names, arrays))
+
+def estimate(protocol="bcn", horizon=20000, dt=1.0, samples=200, tolerance=0.05, **parameters):
+    # integrate the fluid model for horizon cycles, returns arrays (in the broadcast shape of the parameters):
+    #   queueOscillation : max - min of the queue over the last quarter of the horizon
+    #   meanQueue, rate  : mean queue and sender rate over the last quarter
+    #   convergenceTime  : from then on the queue and the rate stay within tolerance of those means (sampled
+    #                      samples times over the horizon, horizon if they never settle)
+    #   drops            : packets dropped (fluid)
+    if protocol == "template":
+        protocol = "none"
+    if protocol not in PARAMETERS:
+        raise ValueError("unknown protocol: %r" % (protocol,))
+    for name in parameters:
+        if name not in PARAMETERS[protocol]:
+            raise ValueError("not a parameter of %s: %s" % (protocol, name))
+    values = dict((name, parameters.get(name, DEFAULTS[name])) for name in PARAMETERS[protocol])
+    arrays = np.broadcast_arrays(*[np.asarray(values[name], dtype=float) for name in values])
+    shape = arrays[0].shape
+    p = dict((name, array.ravel()) for name, array in zip(values, arrays))
+    n = p["numSender"]
+    mu = 1 / p["switchRate"] # service rate of the switch, packets per cycle
+    q = np.zeros(n.shape) # queue
+    rate = p["senderRate"].copy() # rate of the senders (cycles per packet)
+    dqdt = np.zeros(n.shape)
+    drops = np.zeros(n.shape)
+    if protocol == "bcn":
+        qEq = np.round(p["bufferMax"] * p["eqFraction"])
+        qSc = np.round(p["bufferMax"] * p["scFraction"])
+        cm = np.zeros(n.shape) # last congestion measure sampled
+        normal = np.zeros(n.shape, bool) # last message NORMAL
+        stop = np.zeros(n.shape, bool) # last message STOP
+    if protocol == "fecn":
+        advertised = p["switchRate"] * n # r0 = C / N0
+        previous = rate.copy() # advertised rate before the last update, until its tags are ACKed
+        updated = np.zeros(n.shape) # time of the last update
+        nextUpdate = np.zeros(n.shape)
+    steps = max(1, int(round(horizon / dt)))
+    every = max(1, steps // samples)
+    queueSamples = []
+    rateSamples = []
+    for step in range(steps):
+        t = step * dt
+        if protocol == "fecn":
+            due = t >= nextUpdate
+            if due.any():
+                new = np.round(advertised * p["switchRate"] / (rate / n))
+                previous = np.where(due, np.where(advertised > 0, advertised, previous), previous)
+                advertised = np.where(due, new, advertised)
+                updated = np.where(due, t, updated)
+                nextUpdate = np.where(due, nextUpdate + p["tInterval"], nextUpdate)
+            ackDelay = np.maximum(q, 1) * p["switchRate"] # tags of the update reach the senders a queue later
+            target = np.where(t - updated >= ackDelay, advertised, previous)
+            rate = np.where(target > 0, target, rate)
+        send = n / rate # packets per cycle into the switch
+        if protocol == "bcn":
+            send = np.where(stop, 0, send)
+        served = np.where(q > 0, mu, np.minimum(send, mu))
+        dqdt = send - served
+        q = q + dqdt * dt
+        drops += np.maximum(q - p["bufferMax"], 0)
+        q = np.clip(q, 0, p["bufferMax"])
+        if protocol == "bcn":
+            busy = q > 0 # samples are taken at relays only, the senders keep the last message otherwise
+            # the packet level samples integer queue sizes: a queue within half a packet of qEq and a change
+            # below half a packet between samples read as 0
+            sample = (qEq - np.round(q)) + p["weight"] * np.round(p["switchRate"] * dqdt)
+            tagged = rate > p["senderRate"]
+            message = np.where(q <= qEq, np.where(tagged, 1, 0), np.where(q <= qSc, 1, 2)) # NIL 0, NORMAL 1, STOP 2
+            cm = np.where(busy, sample, cm)
+            normal = np.where(busy, message == 1, normal)
+            stop = np.where(busy, message == 2, stop)
+            # rates are rounded at every decrease: one smaller than half a cycle is lost, a dead band
+            decrease = np.where(rate * -cm / p["decreaseFactor"] >= 0.5, -cm / p["decreaseFactor"], 0)
+            change = np.where(cm < 0, decrease, -cm / rate) * dt
+            rate = np.where(normal, np.maximum(rate + change, 1), rate)
+        if step % every == 0:
+            queueSamples.append(q.copy())
+            rateSamples.append(rate.copy())
+    queueSamples = np.array(queueSamples)
+    rateSamples = np.array(rateSamples)
+    tail = queueSamples[len(queueSamples) * 3 // 4:]
+    meanQueue = tail.mean(axis=0)
+    meanRate = rateSamples[len(rateSamples) * 3 // 4:].mean(axis=0)
+    outside = ((np.abs(queueSamples - meanQueue) > tolerance * np.maximum(meanQueue, 1))
+        | (np.abs(rateSamples - meanRate) > tolerance * np.maximum(meanRate, 1)))
+    lastOutside = np.where(outside.any(axis=0), len(outside) - 1 - np.argmax(outside[::-1], axis=0), -1)
+    convergenceTime = np.where(lastOutside == len(outside) - 1, horizon, (lastOutside + 1) * every * dt)
+    result = {"queueOscillation": tail.max(axis=0) - tail.min(axis=0), "meanQueue": meanQueue, "rate": meanRate,
+        "convergenceTime": convergenceTime, "drops": drops}
+    return dict((name, value.reshape(shape)) for name, value in result.items())
@@ -0,0 +1,52 @@
+# Live snapshots of a running simulation
+# snapshots(simulation, interval) runs the simulation as an iterator: it advances `interval` cycles, yields a
+# snapshot (time, queues, sender rates, BCN messages or FECN advertised rates, cumulative counters) and waits
+# there until the consumer asks for the next one, so plotting, early stopping or a live dashboard pace the run
+# themselves. asyncSnapshots is the same as an async iterator, giving the event loop a turn between snapshots.
+#
+#   for snapshot in live.snapshots(simulation, 1000):
+#       plot(snapshot["time"], snapshot["queue"])
+#       if snapshot["queue"] > 100:
+#           break # the simulation can be continued later, e.g. with run()
+
+def snapshot(simulation, time=None): # current state of a simulation as a dict, at time (default: the last event)
+    if time is None:
+        time = simulation.time
+    switches = simulation.switches
+    receiver = simulation.receiver
+    result = {"time": time, "queue": max(switch.buffer.size for switch in switches)}
+    if len(switches) > 1:
+        result["queues"] = dict((switch.name, switch.buffer.size) for switch in switches)
+    result["rates"] = simulation.senderRates()
+    result.update(simulation.control.state())
+    if simulation.population is not None:
+        result["sent"] = int(simulation.population.sent.sum())
+    else:
+        result["sent"] = sum(sender.sent for sender in simulation.senders)
+    result["acked"] = sum(receiver.ackCounter) # in order at the receiver
+    result["ackSent"] = receiver.overhead
+    result["drops"] = sum(switch.buffer.drops for switch in switches)
+    result["finished"] = receiver.finished # num of senders done
+    return result
+
+def snapshots(simulation, interval, until=None):
+    # yield a snapshot every interval cycles until the run stops (all packets ACKed, converged, or cycle until,
+    # default the time limit of the config); the summary of the run is the value of the StopIteration
+    if until is None:
+        until = simulation.config.timeLimit
+    time = simulation.time // interval * interval
+    while not simulation.isStopped() and (until is None or time < until):
+        time = time + interval if until is None else min(time + interval, until)
+        simulation.advance(time)
+        if not simulation.isStopped():
+            yield snapshot(simulation, time)
+    simulation.close()
+    if simulation.isStopped(): # the last snapshot is where the run stopped
+        yield snapshot(simulation)
+    return simulation.summary()
+
+async def asyncSnapshots(simulation, interval, until=None): # snapshots as an async iterator
+    import asyncio # only here: importing it costs more than the rest of netsim
+    for result in snapshots(simulation, interval, until):
+        yield result
+        await asyncio.sleep(0) # let the other tasks run between snapshots
@@ -0,0 +1,115 @@
+# Profiling hooks and hot-path counters
+# Metrics.instrument(simulation) replaces the methods of the components of a simulation (on the instances only)
+# with wrappers counting the calls and the time spent. Nothing is wrapped when profiling is off, so a
+# simulation without Metrics runs the plain methods with no overhead at all.
+# Times are inclusive (Switch.receive includes Buffer.push, Switch.send Switch.relay) and include the cost of the wrappers.
+
+import time as clock
+
+from netsim.control import NoControl
+
+# hooks of a congestion control strategy which are timed when the strategy overrides them
+CONTROL_HOOKS = ("canSend", "onReceive", "onRelay", "update")
+SENDER_HOOKS = ("afterSend", "onAck") # one Sender each
+POPULATION_HOOKS = ("afterPopulationSend", "onPopulationAck") # SenderPopulation
+
+class Metrics:
+    def __init__(self):
+        self.calls = {} # component -> num of calls
+        self.seconds = {} # component -> time spent in seconds
+        self.events = 0 # num of events processed
+        self.activeCycles = 0 # num of cycles with at least one event
+        self.cycles = 0 # num of cycles simulated
+        self.wallTime = 0 # time spent in the event loop
+        self.lastCycle = -1
+
+    def wrap(self, obj, method, name): # time obj.method under name
+        original = getattr(obj, method)
+        calls = self.calls
+        seconds = self.seconds
+        calls.setdefault(name, 0)
+        seconds.setdefault(name, 0.0)
+        perf = clock.perf_counter
+        def timed(*args):
+            start = perf()
+            try:
+                return original(*args)
+            finally:
+                seconds[name] += perf() - start
+                calls[name] += 1
+        setattr(obj, method, timed)
+
+    def instrument(self, simulation):
+        self.simulation = simulation
+        for switch in simulation.switches:
+            self.wrap(switch, "send", "Switch.send")
+            self.wrap(switch, "relay", "Switch.relay") # called by send, straight by the simulation with fractional rates
+            self.wrap(switch, "receive", "Switch.receive")
+            self.wrap(switch.buffer, "push", "Buffer.push")
+            self.wrap(switch.buffer, "pop", "Buffer.pop")
+        self.wrap(simulation.receiver, "handlePacket", "Receiver.handlePacket")
+        if simulation.trace is not None:
+            self.wrap(simulation.trace, "record", "Trace.record")
+        self.wrap(simulation.events, "pop", "EventQueue.pop")
+        for sender in simulation.senders:
+            self.wrap(sender, "sendPacket", "Sender.sendPacket")
+            self.wrap(sender, "transmit", "Sender.transmit")
+            self.wrap(sender, "checkTimeout", "Sender.checkTimeout")
+            self.wrap(sender, "ackPacket", "Sender.ackPacket")
+        if simulation.population is not None:
+            for method in ("sendPackets", "ackPacket", "rateUpdate", "handleRDTag"):
+                self.wrap(simulation.population, method, "SenderPopulation." + method)
+        control = simulation.control
+        hooks = CONTROL_HOOKS + (SENDER_HOOKS if simulation.population is None else POPULATION_HOOKS)
+        for hook in hooks:
+            if getattr(type(control), hook) is not getattr(NoControl, hook):
+                self.wrap(control, hook, type(control).__name__ + "." + hook)
+        # count events and the cycles they happen in
+        step = simulation.step
+        perf = clock.perf_counter
+        def countedStep():
+            start = perf()
+            step()
+            self.wallTime += perf() - start
+            self.events += 1
+            if simulation.time != self.lastCycle:
+                self.lastCycle = simulation.time
+                self.activeCycles += 1
+            self.cycles = simulation.time + 1
+        simulation.step = countedStep
+
+    def idleRatio(self): # fraction of the simulated cycles where nothing happens (skipped by the event queue)
+        if self.cycles == 0:
+            return 0
+        return 1 - self.activeCycles / self.cycles
+
+    def eventsPerCycle(self): # events per cycle with something to do
+        if self.activeCycles == 0:
+            return 0
+        return self.events / self.activeCycles
+
+    def asDict(self):
+        components = {}
+        for name in self.calls:
+            components[name] = {"calls": self.calls[name], "seconds": self.seconds[name]}
+        return {"events": self.events, "cycles": self.cycles, "activeCycles": self.activeCycles,
+            "idleRatio": self.idleRatio(), "eventsPerCycle": self.eventsPerCycle(), "wallTime": self.wallTime,
+            "components": components}
+
+    def report(self): # end of run report
+        return formatReport(self.asDict())
+
+def formatReport(profile): # report of Metrics.asDict() (the "profile" of the summary), components by time spent
+    components = profile["components"]
+    wallTime = profile["wallTime"]
+    lines = ["%-36s %10s %10s %9s %6s" % ("component", "calls", "time (s)", "us/call", "%loop")]
+    for name in sorted(components, key=lambda name: -components[name]["seconds"]):
+        calls = components[name]["calls"]
+        seconds = components[name]["seconds"]
+        perCall = seconds / calls * 1e6 if calls else 0
+        share = 100 * seconds / wallTime if wallTime else 0
+        lines.append("%-36s %10d %10.4f %9.2f %6.1f" % (name, calls, seconds, perCall, share))
+    lines.append("events: %d, cycles: %d, active cycles: %d (idle %.1f%%), events per active cycle: %.2f, loop time: %.4fs"
+        % (profile["events"], profile["cycles"], profile["activeCycles"], 100 * profile["idleRatio"],
+        profile["eventsPerCycle"], wallTime))
+    return "\n".join(lines)
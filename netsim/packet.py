@@ -0,0 +1,18 @@
+# Packets sent from the senders to the receiver
+# A slotted record instead of a dict, so no per-packet dict is allocated and a full buffer holds
+# only the fields below. None is used for "no packet".
+
+class Packet:
+    __slots__ = ("sender", "sentTime", "packetNum", "rate", "tagged", "rd")
+
+    def __init__(self, sender, sentTime, packetNum, rate, tagged=False, rd=-1):
+        self.sender = sender # id of the sender
+        self.sentTime = sentTime # time the packet is sent
+        self.packetNum = packetNum # sequence number of the packet
+        self.rate = rate # rate of the sender when the packet is sent
+        self.tagged = tagged # BCN rate limited tag
+        self.rd = rd # FECN rate discovery tag, -1 if not set
+
+    def __repr__(self):
+        return "Packet(sender=%r, sentTime=%r, packetNum=%r, rate=%r, tagged=%r, rd=%r)" % (
+            self.sender, self.sentTime, self.packetNum, self.rate, self.tagged, self.rd)
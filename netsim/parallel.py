@@ -0,0 +1,132 @@
+# Parallel runs with their traces collected in shared memory (needs NumPy)
+# Sending the per-packet traces of worker processes back to the parent pickles every record and holds two
+# copies of them at the end. Here the parent allocates one shared memory block with a column per trace field
+# for all the runs, every run gets its own slice, and the workers write their records straight into it
+# (netsim.trace.ArrayTrace). Only the summaries go back through the process pool; the parent reads the traces
+# as NumPy views of the block, without copying. The block is unmapped when the results are closed, which is
+# refused (RuntimeError) while a view is still alive: copy what has to outlive the results.
+#
+#   with runShared([(SimulationConfig(numSender=4), "bcn"), (SimulationConfig(numSender=4), "fecn")]) as results:
+#       for i in range(len(results)):
+#           trace = results.trace(i) # field -> array of the records of run i
+#           print(results.summaries[i]["received"], (trace["receiveTime"] - trace["sentTime"]).mean())
+#       del trace # the views must be gone before the block is closed
+
+import concurrent.futures
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from netsim.config import SimulationConfig
+from netsim.simulation import Simulation, flowSizes
+from netsim.topology import makeTopology
+from netsim.trace import FIELDS, TYPECODES
+
+CAPACITY_FACTOR = 2 # default room per run: this many records per packet to send (retransmissions)
+
+class SharedColumns: # trace columns of `length` records in one shared memory block
+    def __init__(self, length, name=None):
+        self.length = length
+        self.dtypes = [np.dtype(TYPECODES[field]) for field in FIELDS]
+        size = max(1, sum(dtype.itemsize for dtype in self.dtypes) * length)
+        if name is None: # created by the parent
+            self.block = shared_memory.SharedMemory(create=True, size=size)
+        else: # attached by a worker
+            self.block = shared_memory.SharedMemory(name=name)
+        self.name = self.block.name
+        self.columns = {} # field -> NumPy view of the block
+        offset = 0
+        for field, dtype in zip(FIELDS, self.dtypes):
+            self.columns[field] = np.ndarray(length, dtype, self.block.buf, offset)
+            offset += dtype.itemsize * length
+
+    def slice(self, start, stop): # field -> view of the records start to stop
+        return dict((field, column[start:stop]) for field, column in self.columns.items())
+
+    def export(self, start, stop): # field -> view of the records start to stop, holding the block open while alive
+        # np.frombuffer keeps the buffer of the block exported, so close() fails (BufferError) instead of
+        # unmapping memory a view still points to
+        result = {}
+        offset = 0
+        for field, dtype in zip(FIELDS, self.dtypes):
+            result[field] = np.frombuffer(self.block.buf, dtype, stop - start, offset + dtype.itemsize * start)
+            offset += dtype.itemsize * self.length
+        return result
+
+    def close(self): # release the views and detach
+        self.columns = {}
+        self.block.close()
+
+    def unlink(self): # free the block (by the parent, once done)
+        self.block.unlink()
+
+def capacityOf(config): # default num of records of a run, from the senders of its topology and their flow sizes
+    if config.topology is not None:
+        config = config.copy(numSender=makeTopology(config.topology).numSender())
+    numPacket = flowSizes(config)
+    total = config.numSender * numPacket if isinstance(numPacket, int) else sum(numPacket)
+    return CAPACITY_FACTOR * total
+
+def runInBlock(name, length, start, capacity, values, protocol): # run in a worker, records to start.. of block name
+    shared = SharedColumns(length, name)
+    try:
+        values = dict(values, traceLevel="full", traceOutput=shared.slice(start, start + capacity))
+        return Simulation(SimulationConfig(**values), protocol).run()
+    finally:
+        shared.close()
+
+class SharedResults:
+    def __init__(self, shared, starts, summaries):
+        self.shared = shared
+        self.starts = starts # first record of each run in the block
+        self.summaries = summaries # summary of each run, in the order of the runs
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def trace(self, i): # field -> view of the records of run i (the results can not be closed while it is alive)
+        if self.shared is None:
+            raise ValueError("the results are closed")
+        start = self.starts[i]
+        return self.shared.export(start, start + self.summaries[i]["received"] - self.summaries[i].get("traceOverflow", 0))
+
+    def close(self): # free the shared memory, refused while views of trace() are alive
+        if self.shared is not None:
+            try:
+                self.shared.close()
+            except BufferError:
+                raise RuntimeError("views of the traces are still alive, delete them (or copy what is kept) "
+                    "before closing the results") from None
+            self.shared.unlink()
+            self.shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def runShared(runs, workers=None, capacity=None):
+    # run (config, protocol) pairs on a process pool with their traces in shared memory, returns SharedResults
+    # capacity: max records of each run (default: CAPACITY_FACTOR per packet), extra records are counted only
+    configs = []
+    for config, protocol in runs:
+        configs.append(SimulationConfig(**config) if isinstance(config, dict) else config)
+    capacities = [capacity if capacity is not None else capacityOf(config) for config in configs]
+    starts = []
+    length = 0
+    for size in capacities:
+        starts.append(length)
+        length += size
+    shared = SharedColumns(length)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+            futures = [pool.submit(runInBlock, shared.name, length, starts[i], capacities[i], configs[i].asDict(),
+                runs[i][1]) for i in range(len(runs))]
+            summaries = [future.result() for future in futures]
+    except BaseException:
+        shared.close()
+        shared.unlink()
+        raise
+    return SharedResults(shared, starts, summaries)
@@ -0,0 +1,107 @@
+# Vectorized population of senders (needs NumPy)
+# The state of all senders is held in NumPy arrays (struct of arrays) instead of one Sender object each,
+# so that deciding who sends in a cycle and adjusting rates are done as batched array operations.
+# The packets produced are the same as the ones of Sender.sendPacket, so Switch and Receiver are unchanged.
+# Protocol specific adjustments (BCN tags and rate updates, FECN RD tags) are applied by the congestion control.
+
+import numpy as np
+
+from netsim.packet import Packet
+
+NEVER = np.iinfo(np.int64).max # next send time of senders which have finished
+
+class SenderPopulation:
+    def __init__(self, numSender, num, window, rate, arrivals=None):
+        # num: num of packets to send by each sender, or a list of it by id
+        # arrivals: arrival process (netsim.arrivals) already attached, None for periodic senders
+        self.numSender = numSender # num of senders
+        self.num = np.broadcast_to(np.asarray(num, dtype=np.int64), (numSender,)).copy() # num of packets of each sender
+        self.arrivals = arrivals
+        self.window = window # time to wait before timeout
+        self.time = 0 # all senders share the global time
+        self.id = np.arange(numSender, dtype=np.int64) # id of the senders
+        self.rate = np.full(numSender, rate, dtype=np.int64) # rate for rate regulator
+        self.sent = np.zeros(numSender, dtype=np.int64) # num of packets sent
+        self.ack = np.zeros(numSender, dtype=np.int64) # num of packets ACKed
+        self.nextSend = np.zeros(numSender, dtype=np.int64) # next cycle the rate regulator is ready
+        self.deadline = np.full(numSender, -1, dtype=np.int64) # expiry time of the retransmission timer, -1 means not active
+        self.timerPacket = np.full(numSender, -1, dtype=np.int64) # the packet the timer is for
+        self.lastFired = self.id[:0] # ids of the senders which sent in the last call of sendPackets
+        self.lastDue = self.id[:0] # ids of the senders which were ready in it (sent or stopped)
+        if arrivals is not None:
+            self.nextSend[:] = arrivals.nextTimes(self.id, -1, self.rate)
+        self.nextSend[self.num <= 0] = NEVER
+
+    def nextSendTime(self): # the next cycle where any sender is ready, None if all finished
+        t = int(self.nextSend.min()) if self.numSender > 0 else NEVER
+        if t == NEVER:
+            return None
+        return t
+
+    def ackPacket(self, id, ptr): # ACK the packet of sender id
+        if ptr == self.ack[id]:
+            self.ack[id] += 1
+            if self.timerPacket[id] == ptr:
+                self.deadline[id] = -1 # timer stopped
+            if self.ack[id] >= self.num[id]:
+                self.nextSend[id] = NEVER # transmission finished
+
+    def sendPackets(self, time, stopped=False):
+        # senders ready in this cycle send a packet each (if any), returned in order of id
+        # stopped: senders are not allowed to send (BCN stop message)
+        self.time = time
+        due = np.flatnonzero(self.nextSend == time)
+        rate = self.rate[due]
+        self.lastDue = due
+        if self.arrivals is None:
+            self.nextSend[due] = time + rate
+        # with an arrival process the next send times are drawn by drawArrivals, once the control updated the rates
+        if stopped:
+            self.lastFired = due[:0]
+            return []
+        self.lastFired = due
+        timeout = (self.deadline[due] >= 0) & (self.deadline[due] <= time)
+        new = ~timeout & (self.sent[due] < self.num[due]) # not all packets sent at least once, no timeout
+        packetNum = np.where(timeout, self.timerPacket[due], self.sent[due])
+        # restart the timers of timeout packets
+        retx = due[timeout]
+        self.deadline[retx] = time + self.window
+        # send new packets
+        self.sent[due[new]] += 1
+        send = new | timeout # others wait for timeout
+        ids = due[send].tolist()
+        packetNums = packetNum[send].tolist()
+        rates = rate[send].tolist()
+        return [Packet(ids[k], time, packetNums[k], rates[k]) for k in range(len(ids))]
+
+    def drawArrivals(self): # next send times of the senders ready in the last sendPackets, at their current rate
+        due = self.lastDue
+        self.nextSend[due] = self.arrivals.nextTimes(due, self.time, self.rate[due])
+
+    # methods for BCN
+    def rateUpdate(self, ids, congestionMeasure, decreaseFactor=40): # AIMD update of the rate of senders ids (after sending in this cycle)
+        if len(ids) == 0 or congestionMeasure == 0:
+            return
+        if congestionMeasure < 0: # decrease rate (increase in number)
+            self.rate[ids] = np.round(self.rate[ids] * (1 - congestionMeasure / decreaseFactor))
+        else: # increase rate (decrease in number)
+            self.rate[ids] = np.maximum(np.round(self.rate[ids] - congestionMeasure), 1) # weight may be fractional
+        if self.arrivals is not None: # the next send times are drawn after the update (drawArrivals)
+            return
+        # ready again at the next multiple of the new rate after this cycle
+        rate = self.rate[ids]
+        self.nextSend[ids] = (self.time + rate) // rate * rate
+
+    # methods for FECN
+    def handleRDTag(self, ids, rd, time): # adjust the rate of senders ids according to the RD tags
+        ids = np.atleast_1d(ids)
+        rd = np.atleast_1d(rd)
+        change = rd > 0
+        ids = ids[change]
+        self.rate[ids] = rd[change]
+        if self.arrivals is not None: # the next send times are drawn already
+            return
+        # ready at the next multiple of the new rate from this cycle on
+        ids = ids[self.ack[ids] < self.num[ids]]
+        rate = self.rate[ids]
+        self.nextSend[ids] = (time + rate - 1) // rate * rate
@@ -0,0 +1,46 @@
+# receiver to receive the packets sent by senders
+
+class Receiver:
+    def __init__(self, numSender, numPacket, trace=None, ackEveryPacket=False, stats=None):
+        self.numSender = numSender # the number of senders in the system
+        if isinstance(numPacket, int):
+            numPacket = [numPacket] * numSender
+        self.numPacket = numPacket # the number of packets expected from each sender, by id
+        self.time = 0 # global time for data analysis
+        self.overhead = 0 # counting the num of ACK sent
+        self.ackCounter = [0] * numSender # counting the packets ACKed, by id (next in-order packet expected)
+        self.finished = sum(1 for num in numPacket if num <= 0) # num of senders with all packets ACKed (none to send: at once)
+        self.trace = trace # sink recording the received packets (netsim.trace), None for no trace
+        self.ackEveryPacket = ackEveryPacket # count an ACK for every packet (TCP, used by BCN), otherwise in-order packets only
+        self.stats = stats # streaming statistics (netsim.stats), None for none
+
+    def checkFinish(self): # check if all transmission are finished
+        return self.finished == self.numSender
+
+    def timePass(self, cycles=1): # update the timers
+        self.time += cycles
+
+    def getOverhead(self): # get the overhead count
+        return self.overhead
+
+    """
+    packets received : Packet(sender, sentTime, packetNum, rate), None means no packet
+    """
+
+    def handlePacket(self, packet): # will return the correct ACK when receive packet
+        if packet is not None:
+            if self.trace is not None: # record received packets
+                self.trace.record(packet.sender, packet.packetNum, packet.sentTime, self.time, packet.rate)
+            if self.stats is not None:
+                self.stats.record(packet.sender, packet.sentTime, self.time)
+            id = packet.sender
+            packetNum = packet.packetNum
+            ack = (id, packetNum)
+            inOrder = packetNum == self.ackCounter[id]
+            if inOrder:
+                self.ackCounter[id] += 1
+                if self.ackCounter[id] == self.numPacket[id]:
+                    self.finished += 1
+            if inOrder or self.ackEveryPacket:
+                self.overhead += 1
+            return ack
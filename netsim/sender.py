@@ -0,0 +1,59 @@
+# senders to send packets to the receiver
+
+from netsim.packet import Packet
+from netsim.timers import TimerHeap
+
+class Sender:
+    def __init__(self, id, num, window, rate):
+        self.id = id # id of the sender
+        self.num = num # num of packets to send
+        self.window = window # time to wait before timeout
+        self.rate = rate # rate for rate regulator (if any)
+        self.sent = 0 # num of packets sent
+        self.ack = 0 # num of packets ACKed
+        self.time = 0 # num of cycle passed since beginning
+        self.waitTimer = TimerHeap() # expiry time of the timers of packets waiting for ACK
+
+    def ackPacket(self, ptr): # ACK the packet
+        if ptr == self.ack:
+            self.ack += 1
+            self.waitTimer.cancel(ptr) # timer stopped
+
+    def timePass(self, cycles=1): # timers hold their expiry time, only the clock moves
+        self.time += cycles
+
+    def checkTimeout(self): # checking any packets sent timeout
+        return self.waitTimer.checkExpired(self.time)
+
+    def setRate(self, newRate): # changing the rate
+        self.rate = newRate
+
+    """
+    packets sent : Packet(self.id, self.time, packetNum, self.rate), None means no packet
+    """
+    def sendPacket(self):
+        if self.ack < self.num: # transmission not finished
+            if self.time % self.rate == 0: # ready according to rate regulator
+                packet = self.transmit()
+            else: # not ready to sent according to rate regulator
+                packet = None
+        else: # transmission finished
+            packet = None
+        return packet
+
+    def transmit(self): # send now (the rate regulator or the arrival process says so)
+        timeout = self.checkTimeout()
+        if self.sent < self.num: # not all packets sent at least once
+            if timeout == -1: # no timeout
+                packet = Packet(self.id, self.time, self.sent, self.rate)
+                self.sent += 1
+            else: # timeout
+                packet = Packet(self.id, self.time, timeout, self.rate)
+                self.waitTimer.arm(timeout, self.time + self.window) # restart timer
+        else: # all packets sent at least once
+            if timeout == -1:
+                packet = None # wait for timeout
+            else:
+                packet = Packet(self.id, self.time, timeout, self.rate)
+                self.waitTimer.arm(timeout, self.time + self.window) # restart timer
+        return packet
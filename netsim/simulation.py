@@ -0,0 +1,344 @@
+# Simulation of senders sending packets through one switch to a receiver, or through a topology of
+# switches (netsim.topology) to several receivers
+# The congestion control (none, BCN or FECN) is a strategy object from netsim.control.
+# Events are taken from a heap (netsim.engine), so idle cycles are skipped.
+# Propagation delays of the links, the ACKs and the BCN feedback go through delay lines (netsim.delay).
+
+from netsim.config import SimulationConfig
+from netsim.control import makeControl
+from netsim.delay import DelayLine
+from netsim.engine import EventQueue, nextMultiple, nextSlot, quantizeRate, ARRIVE, RELAY, SEND, CONTROL, STATS, CHECK
+from netsim.receiver import Receiver
+from netsim.sender import Sender
+from netsim.switch import Switch
+from netsim.topology import Topology, makeTopology
+from netsim.trace import openTrace
+
+class Simulation:
+    def __init__(self, config=None, control="none"):
+        if config is None:
+            config = SimulationConfig()
+        elif isinstance(config, dict):
+            config = SimulationConfig(**config)
+        if config.topology is None:
+            topology = Topology.single(config.bufferMax, config.switchRate, config.numSender)
+        else:
+            topology = makeTopology(config.topology)
+            config = config.copy(numSender=topology.numSender())
+            if config.senderBackend != "object":
+                raise ValueError("topologies need the object sender backend")
+        divisions = config.rateDivisions
+        if not isinstance(divisions, int) or divisions < 1 or divisions & (divisions - 1):
+            raise ValueError("rateDivisions must be a power of 2: %r" % (divisions,))
+        if divisions > 1 and config.senderBackend != "object":
+            raise ValueError("fractional rates need the object sender backend")
+        # the rate regulators only schedule whole cycles from rates which are multiples of 1 / rateDivisions
+        for name, rate in [("senderRate", config.senderRate)] + [("rate of link %s" % topology.linkName(link),
+                topology.links[link][3]) for link in range(len(topology.links))]:
+            if not rate > 0 or (rate * divisions) % 1 != 0:
+                raise ValueError("%s must be a positive multiple of 1 / rateDivisions (%d): %r" % (name, divisions, rate))
+        if type(quantizeRate(config.senderRate, divisions)) is not type(config.senderRate): # e.g. 10.0 -> 10
+            config = config.copy(senderRate=quantizeRate(config.senderRate, divisions))
+        self.config = config
+        # integer rates: ready when cycle % rate == 0, fractional rates: scheduled on their virtual clock
+        self.fractional = divisions > 1
+        self.readyAt = nextSlot if self.fractional else nextMultiple # first cycle at or after time a rate is ready
+        self.control = makeControl(control)
+        # initialization
+        self.topology = topology
+        self.switches = [] # one per link of the topology, index = link id
+        for link in range(len(topology.links)):
+            a, b, bufferMax, rate = topology.links[link]
+            self.switches.append(Switch(bufferMax, quantizeRate(rate, divisions), topology.linkName(link)))
+        self.switch = self.switches[0] # the switch of a single switch simulation
+        routes = topology.routes()
+        self.ingress = [path[0] for path in routes] # sender id -> first link of its route
+        self.nextHop = topology.nextHops(routes) # link -> {sender id: next link, -1 for the receiver}
+        self.paths = [] # sender id -> switches on its route, shared by the senders of the same route
+        paths = {}
+        for path in routes:
+            if id(path) not in paths:
+                paths[id(path)] = [self.switches[link] for link in path]
+            self.paths.append(paths[id(path)])
+        self.arrivals = None # arrival process, None for periodic senders
+        if config.arrivals != "periodic": # random send times (needs NumPy)
+            from netsim.arrivals import makeArrivals, PeriodicArrivals
+            import numpy as np
+            arrivals = makeArrivals(config.arrivals)
+            if not isinstance(arrivals, PeriodicArrivals):
+                arrivals.attach(config.numSender, np.random.SeedSequence(config.seed).spawn(2)[0])
+                self.arrivals = arrivals
+        numPacket = flowSizes(config) # num of packets of each sender, or a list of it by id
+        self.trace = openTrace(config.traceLevel, config.traceOutput, config.traceFormat)
+        self.stats = None # streaming statistics, only when config.statsInterval
+        if config.statsInterval is not None:
+            from netsim.stats import StreamingStats
+            self.stats = StreamingStats(config.statsInterval, config.numSender, config.statsOutput)
+        self.receiver = Receiver(config.numSender, numPacket, self.trace, self.control.ackEveryPacket, self.stats)
+        self.events = EventQueue() # cycles where something is due, idle cycles are skipped
+        self.time = 0 # time of the last event
+        self.lines = [] # delay lines, index = line id, only for the paths with a delay
+        self.linkLines = [] # link id -> delay line to the next hop, None for no delay
+        for link in range(len(topology.links)):
+            delay = topology.delays[link]
+            if delay is None:
+                delay = config.linkDelay
+            self.linkLines.append(self.addLine(delay, self.propagate) if delay > 0 else None)
+        self.ackLine = self.addLine(config.ackDelay, self.acknowledge) if config.ackDelay > 0 else None
+        self.feedbackLine = None # delay line of the feedback of the congestion control (BCN messages)
+        self.senders = [] # object backend
+        self.population = None # array backend
+        if config.senderBackend == "array":
+            from netsim.population import SenderPopulation
+            self.population = SenderPopulation(config.numSender, numPacket, config.window, config.senderRate,
+                self.arrivals)
+            self.events.schedule(0, SEND)
+        elif config.senderBackend == "object":
+            for i in range(config.numSender):
+                num = numPacket if isinstance(numPacket, int) else numPacket[i]
+                sender = Sender(i, num, config.window, config.senderRate)
+                self.senders.append(sender)
+                if self.arrivals is None:
+                    self.events.schedule(0, SEND, i)
+                else:
+                    self.events.schedule(self.arrivals.nextTime(i, -1, sender.rate), SEND, i)
+        else:
+            raise ValueError("unknown sender backend: %r" % (config.senderBackend,))
+        if config.feedbackDelay > 0:
+            self.feedbackLine = self.addLine(config.feedbackDelay, self.control.onFeedback)
+        self.control.attach(self)
+        if self.control.interval is not None:
+            self.events.schedule(0, CONTROL)
+        if self.stats is not None:
+            self.stats.attach(self)
+            self.events.schedule(config.statsInterval, STATS)
+        self.convergence = None # stop criterion, only when config.convergence
+        self.convergedAt = None # time the run is stopped by the criterion
+        if config.convergence is not None:
+            from netsim.convergence import makeCriterion
+            self.convergence = makeCriterion(config.convergence)
+            self.convergence.attach(self)
+            self.events.schedule(self.convergence.interval, CHECK)
+        self.metrics = None # profiling counters, only when config.profile
+        if config.profile:
+            from netsim.metrics import Metrics
+            self.metrics = Metrics()
+            self.metrics.instrument(self)
+        self.fastForward = None # steady-state detection, only when config.fastForward and supported
+        if config.fastForward:
+            from netsim.steadystate import FastForward
+            fastForward = FastForward(self)
+            if fastForward.isSupported():
+                self.fastForward = fastForward
+
+    def isFinished(self): # all packets of all senders ACKed
+        return self.receiver.checkFinish()
+
+    def isStopped(self): # all packets ACKed, or converged
+        return self.convergedAt is not None or self.receiver.checkFinish()
+
+    def senderRates(self): # current rates of the senders, in order of id
+        if self.population is not None:
+            return self.population.rate.tolist()
+        return [sender.rate for sender in self.senders]
+
+    def senderSent(self): # packets sent by each sender so far, in order of id
+        if self.population is not None:
+            return self.population.sent.tolist()
+        return [sender.sent for sender in self.senders]
+
+    def addLine(self, delay, handler): # new delay line, handler(item, time) is called when an item arrives
+        line = DelayLine(len(self.lines), delay, handler)
+        self.lines.append(line)
+        return line
+
+    def delay(self, line, time, item): # send item on a delay line at time
+        if line.push(time, item):
+            self.events.schedule(time + line.delay, ARRIVE, line.id)
+
+    def step(self): # process the next event
+        time, kind, i = self.events.pop()
+        self.time = time
+        if kind == ARRIVE:
+            line = self.lines[i]
+            line.arrive(time)
+            if len(line):
+                self.events.schedule(line.nextTime(), ARRIVE, i)
+        elif kind == RELAY:
+            self.relay(time, i)
+        elif kind == SEND:
+            if self.population is not None:
+                self.sendAll(time)
+            else:
+                self.send(self.senders[i], time)
+        elif kind == CONTROL:
+            for switch in self.switches:
+                switch.timePass(time - switch.time)
+            self.control.update(time)
+            self.events.schedule(time + self.control.interval, CONTROL)
+        elif kind == STATS:
+            self.stats.emit(time)
+            self.events.schedule(time + self.stats.interval, STATS)
+        elif self.convergence.check(time):
+            self.convergedAt = time
+        else:
+            self.events.schedule(time + self.convergence.interval, CHECK)
+
+    def relay(self, time, link=0): # switch relay packets in the buffer, to the next switch or the receiver
+        switch = self.switches[link]
+        switch.timePass(time - switch.time)
+        packet = switch.relay() if self.fractional else switch.send()
+        if packet is None:
+            return
+        self.control.onRelay(switch, packet, time)
+        nextLink = self.nextHop[link][packet.sender]
+        if self.linkLines[link] is not None: # on the link for its propagation delay
+            self.delay(self.linkLines[link], time, (packet, nextLink))
+        elif nextLink >= 0: # forward to the next hop
+            self.receive(packet, time, nextLink)
+        else:
+            self.deliver(packet, time)
+        if not switch.buffer.isEmpty():
+            self.events.schedule(self.readyAt(time + 1, switch.rate), RELAY, link)
+
+    def propagate(self, item, time): # packet at the end of a link with a delay, nextLink -1 for the receiver
+        packet, nextLink = item
+        if nextLink >= 0:
+            self.receive(packet, time, nextLink)
+        else:
+            self.deliver(packet, time)
+
+    def deliver(self, packet, time): # the receiver gets packet and the ACK goes back to its sender
+        self.receiver.timePass(time - self.receiver.time)
+        id, packetNum = self.receiver.handlePacket(packet)
+        if self.ackLine is not None:
+            self.delay(self.ackLine, time, (packet, id, packetNum))
+        else:
+            self.acknowledge((packet, id, packetNum), time)
+
+    def acknowledge(self, ack, time): # the ACK of packet reaches sender id
+        packet, id, packetNum = ack
+        if self.population is not None:
+            population = self.population
+            population.ackPacket(id, packetNum)
+            self.control.onPopulationAck(population, id, packet, time)
+            if population.ack[id] < population.num[id]: # rate may have been changed by the ACK
+                self.events.scheduleBefore(int(population.nextSend[id]), SEND)
+        else:
+            sender = self.senders[id]
+            sender.ackPacket(packetNum)
+            self.control.onAck(sender, packet, time)
+            if sender.ack < sender.num and self.arrivals is None: # rate may have been changed by the ACK
+                self.events.schedule(self.readyAt(time, sender.rate), SEND, id)
+
+    def receive(self, packet, time, link=0): # switch receive a packet
+        switch = self.switches[link]
+        switch.timePass(time - switch.time)
+        self.control.onReceive(switch, packet)
+        switch.receive(packet)
+        if not self.events.isScheduled(RELAY, link) and not switch.buffer.isEmpty():
+            self.events.schedule(self.readyAt(time + 1, switch.rate), RELAY, link)
+
+    def send(self, sender, time): # a sender is ready according to its rate regulator
+        link = self.ingress[sender.id]
+        self.switches[link].timePass(time - self.switches[link].time)
+        sender.timePass(time - sender.time)
+        if sender.ack >= sender.num: # transmission finished
+            return
+        if self.control.canSend(sender):
+            if self.arrivals is None and not self.fractional:
+                packet = sender.sendPacket()
+            else: # the event is the rate regulator (virtual clock) or the arrival process
+                packet = sender.transmit()
+            self.control.afterSend(sender, packet, time)
+            if packet is not None:
+                self.receive(packet, time, link)
+        if self.arrivals is None:
+            self.events.schedule(self.readyAt(time + 1, sender.rate), SEND, sender.id)
+        else:
+            self.events.schedule(self.arrivals.nextTime(sender.id, time, sender.rate), SEND, sender.id)
+
+    def sendAll(self, time): # all senders of the population ready in this cycle (one switch only)
+        self.switch.timePass(time - self.switch.time)
+        population = self.population
+        packets = population.sendPackets(time, not self.control.canSend())
+        self.control.afterPopulationSend(population, population.lastFired, packets, time)
+        if self.arrivals is not None: # from the updated rates, as Simulation.send does
+            population.drawArrivals()
+        for packet in packets:
+            self.receive(packet, time)
+        nextTime = population.nextSendTime()
+        if nextTime is not None:
+            self.events.schedule(nextTime, SEND)
+
+    def advance(self, until=None): # process the events up to cycle until (None: no limit), or until all packets are ACKed
+        if self.fastForward is not None:
+            self.fastForward.advance(until)
+            return
+        while not self.isStopped():
+            nextTime = self.events.nextTime()
+            if nextTime is None or (until is not None and nextTime > until): # nothing left to do, or past until
+                break
+            self.step()
+
+    def run(self): # run until all packets are ACKed (or the time limit), returns the summary metrics
+        self.advance(self.config.timeLimit)
+        self.close()
+        return self.summary()
+
+    def close(self):
+        for switch in self.switches: # switches are only advanced when used, bring them all to the end of the run
+            switch.timePass(self.time - switch.time)
+        if self.trace is not None:
+            self.trace.close()
+
+    def summary(self): # summary metrics
+        result = {}
+        result["finished"] = self.receiver.checkFinish()
+        result["completionTime"] = self.time
+        result["ackSent"] = self.receiver.getOverhead()
+        result.update(self.control.summary())
+        # totals over the switches (the switch itself for one switch), the fullest queue
+        buffers = [switch.buffer for switch in self.switches]
+        result["drops"] = sum(buffer.drops for buffer in buffers)
+        result["peakQueue"] = max(buffer.peak for buffer in buffers)
+        result["meanQueue"] = max(buffer.meanOccupancy() for buffer in buffers)
+        if len(self.switches) > 1:
+            result["switches"] = dict((switch.name, {"drops": switch.buffer.drops, "peakQueue": switch.buffer.peak,
+                "meanQueue": switch.buffer.meanOccupancy()}) for switch in self.switches)
+        if self.trace is not None:
+            result.update(self.trace.summary())
+        if self.stats is not None:
+            result.update(self.stats.summary())
+        if self.convergence is not None:
+            result["converged"] = self.convergedAt is not None
+            result["convergedAt"] = self.convergedAt
+            if self.convergedAt is not None:
+                for name, value in self.convergence.converged().items():
+                    result["converged" + name[0].upper() + name[1:]] = value
+        if self.fastForward is not None:
+            result.update(self.fastForward.summary())
+        if self.metrics is not None:
+            result["profile"] = self.metrics.asDict()
+        return result
+
+def flowSizes(config):
+    # num of packets of each sender of config (numSender already resolved from the topology): numPacket for
+    # fixed sizes, otherwise a list by id drawn from the second seed of config.seed (the first is for the arrivals)
+    if config.flowSize == "fixed":
+        return config.numPacket
+    from netsim.arrivals import makeFlowSize, FixedFlowSize
+    import numpy as np
+    flowSize = makeFlowSize(config.flowSize)
+    if isinstance(flowSize, FixedFlowSize):
+        return config.numPacket
+    return flowSize.sizes(config.numSender, config.numPacket, np.random.SeedSequence(config.seed).spawn(2)[1])
+
+def run_simulation(config=None, protocol="none", cache=None):
+    # run one simulation, config: SimulationConfig (or dict of its fields), protocol: "none"/"template", "bcn",
+    # "fecn" or a congestion control strategy; returns the summary metrics
+    # cache: a netsim.cache.ResultCache (or the path of its database) to look up identical runs, None for none
+    if cache is not None:
+        from netsim.cache import cachedRun
+        return cachedRun(config, protocol, cache)
+    return Simulation(config, protocol).run()
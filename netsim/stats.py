@@ -0,0 +1,181 @@
+# Streaming statistics with bounded memory
+# Computed as the packets arrive (Receiver.handlePacket) and from the occupancy counters of the switch buffers,
+# so the memory used does not grow with the num of packets: per-flow throughput, end-to-end delay histograms
+# with log buckets (HDR style), Jain's fairness index over a sliding window of intervals and the time-weighted
+# queue occupancy. Every `interval` cycles a record of the last interval is emitted as a JSON line (printed or
+# appended to a file), and the summary of the run gets the totals.
+
+import json
+import math
+import statistics
+from collections import deque
+
+SUB_BITS = 5 # delays are exact below 2^SUB_BITS cycles, within 1/2^(SUB_BITS-1) of the value above
+WINDOWS = 10 # intervals in the sliding window of the fairness index
+PERCENTILES = (("p50", 50), ("p99", 99), ("p999", 99.9))
+
+class LogHistogram: # counts of non-negative integers in log buckets: 2^(subBits-1) buckets per power of 2
+    def __init__(self, subBits=SUB_BITS):
+        self.subBits = subBits
+        self.half = 1 << (subBits - 1)
+        self.counts = [] # count of each bucket, grown on demand (a few buckets per power of 2 of the max)
+        self.count = 0 # num of values
+        self.total = 0 # sum of the values
+        self.max = 0 # max value
+
+    def bucket(self, value):
+        shift = value.bit_length() - self.subBits
+        if shift <= 0: # small values have a bucket each
+            return value
+        return shift * self.half + (value >> shift)
+
+    def highest(self, bucket): # highest value of a bucket
+        if bucket < 2 * self.half:
+            return bucket
+        shift = bucket // self.half - 1
+        return ((bucket - shift * self.half + 1) << shift) - 1
+
+    def add(self, value):
+        bucket = self.bucket(value)
+        counts = self.counts
+        if bucket >= len(counts):
+            counts.extend([0] * (bucket + 1 - len(counts)))
+        counts[bucket] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p): # value at percentile p (highest value of its bucket), 0 if empty
+        if self.count == 0:
+            return 0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for bucket in range(len(self.counts)):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.highest(bucket), self.max)
+
+    def mean(self):
+        if self.count == 0:
+            return 0
+        return self.total / self.count
+
+    def clear(self):
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def summary(self):
+        result = {"count": self.count, "mean": self.mean(), "max": self.max}
+        for name, p in PERCENTILES:
+            result[name] = self.percentile(p)
+        return result
+
+def jain(values): # Jain's fairness index, 1 when all equal, 1/n when one value takes everything (None if all 0)
+    total = sum(values)
+    squares = sum(value * value for value in values)
+    if squares == 0:
+        return None
+    return total * total / (len(values) * squares)
+
+def tQuantile(p, df): # quantile p of Student's t distribution with df degrees of freedom
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = statistics.NormalDist().inv_cdf(p) # Cornish-Fisher expansion around the normal quantile
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+        + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * df ** 4))
+
+class StreamingStats:
+    def __init__(self, interval, numSender, output=None, windows=WINDOWS):
+        self.interval = interval # cycles between records
+        self.output = output # None: print the records, otherwise path of a file of JSON lines
+        self.windows = windows
+        self.received = [0] * numSender # packets received per flow before the current interval
+        self.current = [0] * numSender # packets received per flow in the current interval
+        self.window = [0] * numSender # packets received per flow in the intervals of the sliding window
+        self.past = deque() # per-flow counts of those intervals, oldest first
+        self.delays = LogHistogram() # whole run
+        self.intervalDelays = LogHistogram() # current interval
+        self.start = 0 # start of the current interval
+        self.records = 0 # num of records emitted
+        self.last = None # last record
+        if output is not None: # start a new file
+            open(output, "w").close()
+
+    def attach(self, simulation):
+        self.simulation = simulation
+        self.occupancy = [switch.buffer.occupancy for switch in simulation.switches] # at the start of the interval
+
+    def record(self, sender, sentTime, receiveTime): # a packet is received
+        delay = receiveTime - sentTime
+        self.delays.add(delay)
+        self.intervalDelays.add(delay)
+        self.current[sender] += 1
+
+    def activeFlows(self, counts): # counts of the flows which received packets or are not finished
+        receiver = self.simulation.receiver
+        return [counts[id] for id in range(len(counts))
+            if counts[id] > 0 or receiver.ackCounter[id] < receiver.numPacket[id]]
+
+    def emit(self, time): # end of an interval: emit its record and start the next one
+        length = time - self.start
+        current = self.current
+        window = self.window
+        for id in range(len(current)):
+            self.received[id] += current[id]
+            window[id] += current[id]
+        self.past.append(current)
+        if len(self.past) > self.windows:
+            oldest = self.past.popleft()
+            for id in range(len(oldest)):
+                window[id] -= oldest[id]
+        record = {"time": time}
+        if length > 0:
+            record["throughput"] = sum(current) / length # packets per cycle
+            record["minFlowThroughput"] = min(current) / length
+            record["maxFlowThroughput"] = max(current) / length
+        record["fairness"] = jain(self.activeFlows(window))
+        record["delay"] = self.intervalDelays.summary()
+        queues = {}
+        switches = self.simulation.switches
+        for i in range(len(switches)):
+            switch = switches[i]
+            switch.timePass(time - switch.time)
+            occupancy = switch.buffer.occupancy
+            queues[switch.name] = (occupancy - self.occupancy[i]) / length if length > 0 else switch.buffer.size
+            self.occupancy[i] = occupancy
+        record["meanQueue"] = max(queues.values()) # the fullest queue, as in the summary
+        if len(switches) > 1:
+            record["queues"] = queues
+        self.current = [0] * len(current)
+        self.intervalDelays.clear()
+        self.start = time
+        self.records += 1
+        self.last = record
+        self.write(record)
+
+    def write(self, record):
+        line = json.dumps(record)
+        if self.output is None:
+            print(line)
+        else:
+            with open(self.output, "a") as f:
+                f.write(line + "\n")
+
+    def summary(self): # totals of the run up to now
+        time = self.simulation.time
+        received = [self.received[id] + self.current[id] for id in range(len(self.current))]
+        delays = self.delays.summary()
+        result = {}
+        for name, p in PERCENTILES:
+            result[name + "Delay"] = delays[name]
+        result["throughput"] = sum(received) / time if time > 0 else 0
+        result["fairness"] = jain(received)
+        result["flowThroughput"] = [count / time if time > 0 else 0 for count in received]
+        result["statsRecords"] = self.records
+        return result
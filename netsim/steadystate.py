@@ -0,0 +1,213 @@
+# Steady-state detection and fast-forward
+# With periodic senders the simulation often settles into a cycle which repeats exactly, only the packet
+# numbers, times and counters move on. At the end of every cycle the state is fingerprinted relative to the
+# current time and to the packet numbers of each sender (first a cheap key without the contents of the buffers,
+# a hash of the full fingerprint once the key comes back, the full fingerprint only once its hash comes back,
+# to confirm it). When a fingerprint comes back P cycles later, the run is periodic from there on, so whole
+# periods are skipped at once: times move by P per period and every counter by its change over the last period
+# (closed form), stopping before any sender gets near its end.
+# Runs which never repeat exactly would pay for the fingerprints all along: after MAX_IDLE_CYCLES cycles without
+# a period the detection stops and the run goes on as a plain one.
+# The rate regulators are ready on multiples of their rate from cycle 0, so the period must also be a multiple
+# of every rate used during it (a rate which was not there at the fingerprint would otherwise come back out of phase).
+# Object sender backend only, with a summary (or no) trace, periodic traffic and no retransmission timer armed.
+
+import heapq
+
+MAX_FINGERPRINTS = 100000 # keys (and hashes of fingerprints) kept before starting over
+MAX_IDLE_CYCLES = 10000 # cycles fingerprinted without finding a period before giving up
+
+class FastForward:
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.keys = set() # keys seen at the end of a cycle
+        self.fingerprints = {} # hash of a fingerprint -> (time, counters) of the end of a cycle
+        self.confirm = {} # hash which came back -> (fingerprint, time, counters), compared in full when it comes back again
+        self.idle = 0 # cycles fingerprinted since the last period found
+        self.active = True # still looking for a period
+        self.lastSeen = {} # rate -> last end of a cycle it was used at
+        self.skipped = 0 # num of cycles skipped
+        self.jumps = 0 # num of jumps
+
+    def isSupported(self):
+        simulation = self.simulation
+        return (simulation.population is None and simulation.arrivals is None and simulation.metrics is None
+            and simulation.stats is None and simulation.convergence is None and not simulation.lines
+            and (simulation.trace is None or type(simulation.trace).__name__ == "SummaryTrace"))
+
+    def key(self): # state relative to the time and to the packet numbers but the buffer contents, None if it can not be used
+        simulation = self.simulation
+        time = simulation.time
+        rates = set()
+        senders = []
+        for sender in simulation.senders:
+            if len(sender.waitTimer):
+                return None
+            rates.add(sender.rate)
+            base = sender.sent
+            senders.append((sender.rate, sender.ack - base, simulation.receiver.ackCounter[sender.id] - base,
+                time - sender.time))
+        switches = []
+        for switch in simulation.switches:
+            rates.add(switch.rate)
+            switches.append((time - switch.time, switch.buffer.size)) # lazy clocks: occupancy is added up later
+        events = tuple(sorted((key, eventTime - time) for key, eventTime in simulation.events.pending.items()))
+        phase = tuple((rate, time % rate) for rate in sorted(rates)) # rate regulators test time % rate
+        for rate in rates:
+            self.lastSeen[rate] = time
+        return (tuple(senders), tuple(switches), events, phase, time - simulation.receiver.time,
+            simulation.receiver.finished, simulation.control.fingerprint())
+
+    def contents(self): # packets in the buffers, relative to the time and to the packet numbers of their senders
+        simulation = self.simulation
+        time = simulation.time
+        senders = simulation.senders
+        switches = []
+        for switch in simulation.switches:
+            buffer = switch.buffer
+            packets = []
+            for i in range(buffer.size):
+                packet = buffer.element[(buffer.head + i) % buffer.max]
+                packets.append((packet.sender, packet.sentTime - time, packet.packetNum - senders[packet.sender].sent,
+                    packet.rate, packet.tagged, packet.rd))
+            switches.append(tuple(packets))
+        return tuple(switches)
+
+    def counters(self): # everything which moves on linearly in a periodic regime
+        simulation = self.simulation
+        values = []
+        for sender in simulation.senders:
+            values.append(sender.sent)
+            values.append(sender.ack)
+            values.append(simulation.receiver.ackCounter[sender.id])
+        values.append(simulation.receiver.overhead)
+        for switch in simulation.switches:
+            values.append(switch.buffer.drops)
+            values.append(switch.buffer.occupancy)
+        for name in simulation.control.counters:
+            values.append(getattr(simulation.control, name))
+        trace = simulation.trace
+        if trace is not None:
+            values.append(trace.count)
+            values.append(trace.delaySum)
+        return values
+
+    def observe(self, until): # at the end of a cycle: look for a period and skip as many periods as allowed
+        self.idle += 1
+        if self.idle > MAX_IDLE_CYCLES: # no period in sight, stop paying for the fingerprints
+            self.active = False
+            self.reset()
+            return
+        key = self.key()
+        if key is None:
+            return
+        if key not in self.keys:
+            if len(self.keys) >= MAX_FINGERPRINTS:
+                self.reset()
+            self.keys.add(key)
+            return
+        fingerprint = (key, self.contents())
+        digest = hash(fingerprint)
+        simulation = self.simulation
+        time = simulation.time
+        counters = self.counters()
+        if digest not in self.fingerprints:
+            if len(self.fingerprints) >= MAX_FINGERPRINTS:
+                self.reset()
+            self.fingerprints[digest] = (time, counters)
+            return
+        if digest not in self.confirm or self.confirm[digest][0] != fingerprint: # first time back (or a collision)
+            self.confirm[digest] = (fingerprint, time, counters)
+            return
+        start, startCounters = self.confirm[digest][1:]
+        period = time - start
+        if any(period % rate for rate, seen in self.lastSeen.items() if seen >= start):
+            return # a rate of the period would be out of phase, wait for a multiple of the period
+        deltas = [counters[i] - startCounters[i] for i in range(len(counters))]
+        periods = self.maxPeriods(period, deltas, until)
+        if periods > 0:
+            self.jump(periods, period, deltas)
+            self.idle = 0
+        self.reset() # the packet numbers have moved on, start over (also near the end of the run)
+
+    def reset(self):
+        self.keys = set()
+        self.fingerprints = {}
+        self.confirm = {}
+        self.lastSeen = {}
+
+    def maxPeriods(self, period, deltas, until): # periods which can be skipped without changing the behaviour
+        simulation = self.simulation
+        limit = None
+        for sender in simulation.senders: # stop a full period before a sender sends its last packet
+            sent = deltas[3 * sender.id]
+            if sent > 0:
+                periods = (sender.num - sender.sent) // sent - 1
+                if limit is None or periods < limit:
+                    limit = periods
+        if until is not None: # and a period before the time limit
+            periods = (until - simulation.time) // period - 1
+            if limit is None or periods < limit:
+                limit = periods
+        if limit is None: # nothing is sent: stuck
+            return 0
+        return max(limit, 0)
+
+    def jump(self, periods, period, deltas): # skip whole periods, moving times and counters in closed form
+        simulation = self.simulation
+        shift = periods * period
+        moved = [delta * periods for delta in deltas]
+        i = 0
+        for sender in simulation.senders:
+            sender.time += shift
+            sender.sent += moved[i]
+            sender.ack += moved[i + 1]
+            simulation.receiver.ackCounter[sender.id] += moved[i + 2]
+            i += 3
+        receiver = simulation.receiver
+        receiver.time += shift
+        receiver.overhead += moved[i]
+        i += 1
+        for switch in simulation.switches:
+            buffer = switch.buffer
+            switch.time += shift
+            buffer.time += shift
+            buffer.drops += moved[i]
+            buffer.occupancy += moved[i + 1]
+            i += 2
+            for k in range(buffer.size):
+                packet = buffer.element[(buffer.head + k) % buffer.max]
+                packet.sentTime += shift
+                packet.packetNum += moved[3 * packet.sender]
+        for name in simulation.control.counters:
+            setattr(simulation.control, name, getattr(simulation.control, name) + moved[i])
+            i += 1
+        trace = simulation.trace
+        if trace is not None:
+            trace.count += moved[i]
+            trace.delaySum += moved[i + 1]
+            if moved[i]: # packets were received in the skipped periods
+                trace.lastTime += shift
+        events = simulation.events
+        events.pending = dict((key, eventTime + shift) for key, eventTime in events.pending.items())
+        events.heap = [(eventTime, kind, index) for (kind, index), eventTime in events.pending.items()]
+        heapq.heapify(events.heap)
+        simulation.time += shift
+        self.skipped += shift
+        self.jumps += 1
+
+    def advance(self, until=None): # Simulation.advance, fingerprinting the end of every cycle
+        simulation = self.simulation
+        receiver = simulation.receiver
+        events = simulation.events
+        while not receiver.checkFinish():
+            nextTime = events.nextTime()
+            if nextTime is None or (until is not None and nextTime > until):
+                break
+            simulation.step()
+            nextTime = events.nextTime()
+            if self.active and nextTime is not None and nextTime > simulation.time: # end of the cycle
+                self.observe(until)
+
+    def summary(self):
+        return {"skippedCycles": self.skipped, "jumps": self.jumps}
@@ -0,0 +1,217 @@
+# Parameter sweep runner
+# Runs template.py, bcn.py and fecn.py for a list (or grid) of configurations on a process pool and
+# collects their summary metrics into one table. Each finished point is appended to a JSON lines file
+# as soon as it completes, so an interrupted sweep resumes where it stopped.
+#
+# usage: python -m netsim.sweep --protocol bcn fecn --set BUFFER_MAX=20,40 --set NUM_SENDER=2,4,8 \
+#            --output sweep.jsonl --table sweep.csv
+# With random traffic (ARRIVALS, FLOW_SIZE), --replications N runs every point with N seeds and the table
+# has the mean and the half width of the confidence interval (<metric>Ci) of each metric.
+# --cache results.sqlite looks up and stores the summaries of the points (netsim.cache), --refresh reruns them.
+
+import argparse
+import concurrent.futures
+import csv
+import importlib
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
+import time as clock
+
+from netsim.config import CONSTANTS, SimulationConfig
+from netsim.simulation import run_simulation
+from netsim.stats import tQuantile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # where the simulation scripts are
+PROTOCOLS = ("template", "bcn", "fecn")
+SWEEP_DEFAULTS = {"TRACE_LEVEL": "summary"} # no per-packet output from the workers
+
+def grid(protocols, **axes): # every combination of the values of axes, for each protocol
+    names = sorted(axes)
+    points = []
+    for protocol in protocols:
+        for values in itertools.product(*[axes[name] for name in names]):
+            point = {"protocol": protocol}
+            point.update(zip(names, values))
+            points.append(point)
+    return points
+
+def pointKey(point): # canonical identity of a point, used to resume
+    return json.dumps(point, sort_keys=True)
+
+def runPoint(point, cache=None): # run one configuration (in a worker process), returns its row of the table
+    protocol = point["protocol"]
+    if protocol not in PROTOCOLS:
+        raise ValueError("unknown protocol: %r" % (protocol,))
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    # constants of the protocol's script are the defaults
+    module = importlib.import_module(protocol)
+    constants = {}
+    for name in CONSTANTS:
+        if hasattr(module, name):
+            constants[name] = getattr(module, name)
+    constants.update(SWEEP_DEFAULTS)
+    for name, value in point.items():
+        if name != "protocol":
+            if name not in constants:
+                raise ValueError("unknown constant for %s: %s" % (protocol, name))
+            constants[name] = value
+    start = clock.perf_counter()
+    result = run_simulation(SimulationConfig.fromConstants(constants), protocol, cache)
+    row = {"key": pointKey(point)}
+    row.update(point)
+    row.update(result)
+    row["wallTime"] = clock.perf_counter() - start
+    return row
+
+def loadResults(output): # rows written so far, a line cut off by an interruption is ignored
+    rows = []
+    if os.path.exists(output):
+        with open(output) as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    pass
+    return rows
+
+def runSweep(points, output, workers=None, verbose=True, cache=None):
+    # run the points not yet in output (failed points are retried), returns all rows of output
+    # cache: netsim.cache.ResultCache shared by the workers, None for none
+    done = set()
+    for row in loadResults(output):
+        if "error" not in row:
+            done.add(row["key"])
+    todo = []
+    for point in points:
+        key = pointKey(point)
+        if key not in done:
+            done.add(key) # duplicated points are run once
+            todo.append(point)
+    if verbose:
+        print("%d points, %d to run" % (len(points), len(todo)), file=sys.stderr)
+    if todo:
+        if os.path.exists(output) and os.path.getsize(output) > 0:
+            with open(output, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                cut = f.read(1) != b"\n"
+        else:
+            cut = False
+        with open(output, "a") as f, concurrent.futures.ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+            if cut:
+                f.write("\n") # finish the line cut off by an interruption
+            futures = {}
+            for point in todo:
+                futures[pool.submit(runPoint, point, cache)] = point
+            try:
+                for count, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                    point = futures[future]
+                    try:
+                        row = future.result()
+                    except Exception as e:
+                        row = {"key": pointKey(point)}
+                        row.update(point)
+                        row["error"] = repr(e)
+                    f.write(json.dumps(row) + "\n")
+                    f.flush()
+                    if verbose:
+                        print("%d/%d %s" % (count, len(todo), "failed" if "error" in row else "done"), file=sys.stderr)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+    return loadResults(output)
+
+def writeTable(rows, path): # write the rows as one csv table
+    columns = []
+    for row in rows:
+        for name in row:
+            if name != "key" and name not in columns:
+                columns.append(name)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+def replicate(points, replications, firstSeed=0): # every point with seeds firstSeed, firstSeed + 1, ...
+    replicated = []
+    for point in points:
+        for seed in range(firstSeed, firstSeed + replications):
+            point = dict(point)
+            point["SEED"] = seed
+            replicated.append(point)
+    return replicated
+
+def confidenceRows(rows, confidence=0.95):
+    # one row per point of the replications (rows of the same point with different SEED): the mean of each
+    # numeric metric and the half width of its confidence interval (<metric>Ci), with the num of replications
+    groups = {}
+    for row in rows:
+        if "error" in row:
+            continue
+        point = json.loads(row["key"])
+        point.pop("SEED", None)
+        groups.setdefault(pointKey(point), (point, []))[1].append(row)
+    table = []
+    for point, replications in groups.values():
+        result = dict(point)
+        result["replications"] = len(replications)
+        for name, value in replications[0].items():
+            if name in point or name in ("key", "SEED") or not isinstance(value, (int, float)):
+                continue
+            values = [row[name] for row in replications if isinstance(row.get(name), (int, float))]
+            result[name] = statistics.fmean(values)
+            if len(values) > 1:
+                t = tQuantile(0.5 + confidence / 2, len(values) - 1)
+                result[name + "Ci"] = t * statistics.stdev(values) / math.sqrt(len(values))
+            else:
+                result[name + "Ci"] = None
+        table.append(result)
+    return table
+
+def parseValue(text): # numbers, null, true/false as JSON, anything else as a string
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="run template/bcn/fecn over a grid of constants")
+    parser.add_argument("--protocol", nargs="+", choices=PROTOCOLS, default=list(PROTOCOLS))
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2,...", help="values of a constant")
+    parser.add_argument("--points", help="JSON file with a list of points, instead of a grid")
+    parser.add_argument("--output", default="sweep.jsonl", help="results, appended as points finish (resumable)")
+    parser.add_argument("--table", help="also write all results as a csv table")
+    parser.add_argument("--workers", type=int, help="num of worker processes (default: all cores)")
+    parser.add_argument("--replications", type=int, help="run every point with this many seeds (random traffic)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="level of the confidence intervals")
+    parser.add_argument("--cache", help="SQLite result cache, identical points are looked up instead of run")
+    parser.add_argument("--refresh", action="store_true", help="rerun the points and replace their cached results")
+    args = parser.parse_args(argv)
+    if args.points:
+        with open(args.points) as f:
+            points = json.load(f)
+    else:
+        axes = {}
+        for item in args.set:
+            name, _, values = item.partition("=")
+            axes[name] = [parseValue(value) for value in values.split(",")]
+        points = grid(args.protocol, **axes)
+    if args.replications:
+        points = replicate(points, args.replications)
+    cache = None
+    if args.cache:
+        from netsim.cache import ResultCache
+        cache = ResultCache(args.cache, bypass=args.refresh)
+    rows = runSweep(points, args.output, args.workers, cache=cache)
+    if args.replications:
+        keys = set(pointKey(point) for point in points)
+        rows = confidenceRows([row for row in rows if row["key"] in keys], args.confidence)
+    if args.table:
+        writeTable(rows, args.table)
+
+if __name__ == "__main__":
+    main()
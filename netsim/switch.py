@@ -0,0 +1,34 @@
+# switch to relay packets sent from senders to the receiver
+
+from netsim.buffer import Buffer
+
+class Switch:
+    def __init__(self, max, rate, name="switch"):
+        self.buffer = Buffer(max) # the buffer of the switch
+        self.rate = rate # rate regulator for simulation
+        self.name = name # name of the link of a topology (netsim.topology) the switch is the output port of
+        self.time = 0 # global time
+
+    def timePass(self, cycles=1): # update time
+        self.time += cycles
+        self.buffer.timePass(cycles)
+
+    def bufferSize(self): # return current size of buffer
+        return self.buffer.getSize()
+
+    def receive(self, newElement): # return False if the packet is dropped
+        if newElement is not None:
+            return self.buffer.push(newElement)
+        return False
+
+    def send(self):
+        if self.time % self.rate == 0: # ready to relay according to rate regulator
+            return self.relay()
+        else: # not ready to relay
+            return None
+
+    def relay(self): # relay now (fractional rates are scheduled by the simulation on their virtual clock)
+        if self.buffer.isEmpty(): # nothing to relay
+            return None
+        else: # something to relay
+            return self.buffer.pop()
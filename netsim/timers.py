@@ -0,0 +1,49 @@
+# Retransmission timers of a sender
+# Each armed timer is stored as the absolute cycle it expires at, in a min-heap, so the sender does
+# not need to touch its timers as time passes and only pays for the packets actually in flight
+# (the heap is compacted when stale entries pile up, so its size stays within a constant factor of them)
+
+import heapq
+
+SLACK = 16 # stale entries allowed in the heap besides one per armed timer
+
+class TimerHeap:
+    def __init__(self):
+        self.heap = [] # min-heap of (deadline, packetNum)
+        self.deadline = {} # packetNum -> deadline of its armed timer
+        # entries in the heap which do not match deadline are stale (re-armed or cancelled)
+
+    def __len__(self): # num of armed timers
+        return len(self.deadline)
+
+    def arm(self, packetNum, deadline): # (re)start the timer of a packet, O(log n)
+        self.deadline[packetNum] = deadline
+        heapq.heappush(self.heap, (deadline, packetNum))
+        if len(self.heap) > 2 * len(self.deadline) + SLACK:
+            self.compact()
+
+    def compact(self): # drop the stale entries, O(n)
+        self.heap = [(deadline, packetNum) for packetNum, deadline in self.deadline.items()]
+        heapq.heapify(self.heap)
+
+    def cancel(self, packetNum): # stop the timer of a packet, O(1)
+        self.deadline.pop(packetNum, None)
+        if not self.deadline:
+            self.heap.clear() # nothing armed, drop the stale entries at once
+
+    def isArmed(self, packetNum):
+        return packetNum in self.deadline
+
+    def nextExpiry(self): # (deadline, packetNum) of the timer expiring first, None if no timer is armed
+        heap = self.heap
+        while heap and self.deadline.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        if heap:
+            return heap[0]
+        return None
+
+    def checkExpired(self, time): # the packet whose timer expired first by time, -1 if none expired
+        expiry = self.nextExpiry()
+        if expiry is not None and expiry[0] <= time:
+            return expiry[1]
+        return -1
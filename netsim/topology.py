@@ -0,0 +1,156 @@
+# Topologies of switches between the senders and the receivers
+# A topology has nodes (switches and receivers) and directed links a -> b in the direction of the data.
+# Each link is an output port of a with its own buffer and rate, simulated by one Switch.
+# Each flow is one sender attached to a switch, sending to a receiver. Routes are shortest paths (in hops),
+# computed once into per-link next-hop tables so that forwarding a packet is a single lookup.
+#
+# A topology can be described by a dict (e.g. for the TOPOLOGY constant of the scripts or sweep points):
+#   {"receivers": ["r"],
+#    "links": [["s1", "s2", bufferMax, rate], ["s2", "r", bufferMax, rate, delay]],
+#    "flows": [["s1", "r", numSender], ["s2", "r", numSender]]}
+
+from collections import deque
+
+class Topology:
+    def __init__(self):
+        self.receivers = [] # names of the receiver nodes
+        self.links = [] # (a, b, bufferMax, rate) of each link, index = link id
+        self.delays = [] # propagation delay of each link (cycles), None for the delay of the config
+        self.linkIds = {} # (a, b) -> link id
+        self.flows = [] # (source switch, receiver) of each sender, index = sender id
+
+    def addReceiver(self, name):
+        if name not in self.receivers:
+            self.receivers.append(name)
+
+    def addLink(self, a, b, bufferMax, rate, delay=None): # output port of a towards b
+        if (a, b) in self.linkIds:
+            raise ValueError("duplicate link: %s -> %s" % (a, b))
+        if a in self.receivers:
+            raise ValueError("link from a receiver: %s -> %s" % (a, b))
+        self.linkIds[(a, b)] = len(self.links)
+        self.links.append((a, b, bufferMax, rate))
+        self.delays.append(delay)
+
+    def addFlow(self, source, receiver, count=1): # count senders attached to switch source, sending to receiver
+        for i in range(count):
+            self.flows.append((source, receiver))
+
+    def numSender(self):
+        return len(self.flows)
+
+    def linkName(self, link):
+        return "%s->%s" % self.links[link][:2]
+
+    def nextLinks(self, receiver): # node -> first link of its shortest path to receiver (breadth first from receiver)
+        incoming = {} # node -> links into it
+        for link, (a, b, bufferMax, rate) in enumerate(self.links):
+            incoming.setdefault(b, []).append(link)
+        nextLink = {}
+        queue = deque([receiver])
+        while queue:
+            node = queue.popleft()
+            for link in incoming.get(node, []):
+                a = self.links[link][0]
+                if a != receiver and a not in nextLink:
+                    nextLink[a] = link
+                    queue.append(a)
+        return nextLink
+
+    def routes(self): # links on the path of each sender, in order
+        nextLinks = {}
+        for receiver in self.receivers:
+            nextLinks[receiver] = self.nextLinks(receiver)
+        paths = {} # the senders of a (source, receiver) pair share their path
+        routes = []
+        for source, receiver in self.flows:
+            if receiver not in nextLinks:
+                raise ValueError("unknown receiver: %s" % receiver)
+            if (source, receiver) not in paths:
+                nextLink = nextLinks[receiver]
+                if source not in nextLink:
+                    raise ValueError("no route from %s to %s" % (source, receiver))
+                path = []
+                node = source
+                while node != receiver:
+                    link = nextLink[node]
+                    path.append(link)
+                    node = self.links[link][1]
+                paths[(source, receiver)] = path
+            routes.append(paths[(source, receiver)])
+        return routes
+
+    def nextHops(self, routes): # per link: sender id -> next link of its route, -1 for the receiver
+        nextHops = [{} for link in self.links]
+        for id, path in enumerate(routes):
+            for i in range(len(path)):
+                nextHops[path[i]][id] = path[i + 1] if i + 1 < len(path) else -1
+        return nextHops
+
+    def asDict(self):
+        flows = []
+        for flow in self.flows: # runs of senders with the same flow
+            if flows and tuple(flows[-1][:2]) == flow:
+                flows[-1][2] += 1
+            else:
+                flows.append([flow[0], flow[1], 1])
+        links = []
+        for link in range(len(self.links)):
+            links.append(list(self.links[link]))
+            if self.delays[link] is not None:
+                links[-1].append(self.delays[link])
+        return {"receivers": list(self.receivers), "links": links, "flows": flows}
+
+    @staticmethod
+    def fromDict(description):
+        topology = Topology()
+        for name in description.get("receivers", []):
+            topology.addReceiver(name)
+        for link in description["links"]: # [a, b, bufferMax, rate] or [a, b, bufferMax, rate, delay]
+            topology.addLink(*link)
+        for flow in description["flows"]:
+            topology.addFlow(*flow)
+        return topology
+
+    @staticmethod
+    def single(bufferMax, rate, numSender): # the one switch of template.py, bcn.py and fecn.py
+        topology = Topology()
+        topology.addReceiver("receiver")
+        topology.addLink("switch", "receiver", bufferMax, rate)
+        topology.addFlow("switch", "receiver", numSender)
+        return topology
+
+    @staticmethod
+    def parkingLot(numSwitch, bufferMax, rate, sendersPerSwitch=1):
+        # switches s0 -> s1 -> ... -> receiver in a chain, the senders of every switch send to the receiver
+        # so the flows from s0 cross every link
+        topology = Topology()
+        topology.addReceiver("receiver")
+        for i in range(numSwitch):
+            b = "s%d" % (i + 1) if i + 1 < numSwitch else "receiver"
+            topology.addLink("s%d" % i, b, bufferMax, rate)
+        for i in range(numSwitch):
+            topology.addFlow("s%d" % i, "receiver", sendersPerSwitch)
+        return topology
+
+    @staticmethod
+    def fatTreeSlice(numEdge, bufferMax, rate, sendersPerEdge=1, coreRate=None):
+        # edge switches e0..e(n-1) under one aggregation switch, receiver r(i) below edge switch e(i);
+        # the senders of e(i) send to the receiver of the next edge switch through the aggregation switch
+        if coreRate is None:
+            coreRate = rate
+        topology = Topology()
+        for i in range(numEdge):
+            topology.addReceiver("r%d" % i)
+        for i in range(numEdge):
+            topology.addLink("e%d" % i, "agg", bufferMax, coreRate)
+            topology.addLink("agg", "e%d" % i, bufferMax, coreRate)
+            topology.addLink("e%d" % i, "r%d" % i, bufferMax, rate)
+        for i in range(numEdge):
+            topology.addFlow("e%d" % i, "r%d" % ((i + 1) % numEdge), sendersPerEdge)
+        return topology
+
+def makeTopology(description): # Topology from a Topology or its dict description
+    if isinstance(description, Topology):
+        return description
+    return Topology.fromDict(description)
@@ -0,0 +1,223 @@
+# Trace of the packets received by the receiver
+# Sinks for the three trace levels:
+#   "off"     : no sink at all, the receiver does not format anything
+#   "summary" : SummaryTrace, only totals are kept
+#   "full"    : every received packet is recorded, printed (PrintTrace), written as text (CsvTrace)
+#               or written in bulk as binary columns (BinaryTrace) or into preallocated arrays (ArrayTrace)
+
+import array
+import json
+import os
+import sys
+
+OFF = "off"
+SUMMARY = "summary"
+FULL = "full"
+
+FIELDS = ("sender", "packetNum", "sentTime", "receiveTime", "rate") # fields of a record
+TYPECODES = {"sender": "q", "packetNum": "q", "sentTime": "q", "receiveTime": "q", "rate": "d"} # array typecodes
+DTYPES = {"q": "i8", "d": "f8"} # matching NumPy dtypes (without byte order)
+CSV_FORMAT = "%s;%s;%s;%s;%s" # output: "sender;packet;sendTime;ReceiveTime;rate"
+CHUNK = 65536 # records buffered before writing
+
+class SummaryTrace: # level "summary", keeps totals only
+    def __init__(self):
+        self.count = 0 # num of packets received
+        self.delaySum = 0 # sum of the delay (receiveTime - sentTime)
+        self.delayMax = 0 # max delay
+        self.lastTime = 0 # time the last packet is received
+
+    def record(self, sender, packetNum, sentTime, receiveTime, rate):
+        self.count += 1
+        delay = receiveTime - sentTime
+        self.delaySum += delay
+        if delay > self.delayMax:
+            self.delayMax = delay
+        self.lastTime = receiveTime
+
+    def meanDelay(self):
+        if self.count == 0:
+            return 0
+        return self.delaySum / self.count
+
+    def summary(self):
+        return {"received": self.count, "meanDelay": self.meanDelay(), "maxDelay": self.delayMax, "lastTime": self.lastTime}
+
+    def close(self):
+        pass
+
+def totalsTrace(count, delaySum, delayMax, lastTime): # SummaryTrace carrying on from these totals
+    trace = SummaryTrace()
+    trace.count = count
+    trace.delaySum = delaySum
+    trace.delayMax = delayMax
+    trace.lastTime = lastTime
+    return trace
+
+class PrintTrace(SummaryTrace): # print every record to the screen (the original output)
+    def __init__(self, format=CSV_FORMAT):
+        SummaryTrace.__init__(self)
+        self.format = format # % format of a line, fields in the order of FIELDS
+
+    def record(self, sender, packetNum, sentTime, receiveTime, rate):
+        SummaryTrace.record(self, sender, packetNum, sentTime, receiveTime, rate)
+        print(self.format % (sender, packetNum, sentTime, receiveTime, rate))
+
+class CsvTrace(SummaryTrace): # write every record as a line of text, in the format of the printed output
+    def __init__(self, path, format=CSV_FORMAT):
+        SummaryTrace.__init__(self)
+        self.format = format
+        self.file = open(path, "w")
+        self.lines = [] # lines not written yet
+
+    def record(self, sender, packetNum, sentTime, receiveTime, rate):
+        SummaryTrace.record(self, sender, packetNum, sentTime, receiveTime, rate)
+        self.lines.append(self.format % (sender, packetNum, sentTime, receiveTime, rate) + "\n")
+        if len(self.lines) >= CHUNK:
+            self.flush()
+
+    def flush(self):
+        self.file.writelines(self.lines)
+        self.lines = []
+
+    def __reduce__(self): # snapshots (netsim.checkpoint) keep the totals, the records stay in the file
+        return (totalsTrace, (self.count, self.delaySum, self.delayMax, self.lastTime))
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+class BinaryTrace(SummaryTrace):
+    # write the records as binary columns, one file of fixed-width values per field in directory,
+    # described by meta.json (readable with readTrace, or with np.memmap / np.fromfile)
+    def __init__(self, directory, chunk=CHUNK):
+        SummaryTrace.__init__(self)
+        self.directory = directory
+        self.chunk = chunk
+        os.makedirs(directory, exist_ok=True)
+        self.files = {}
+        for field in FIELDS:
+            self.files[field] = open(os.path.join(directory, field + ".bin"), "wb")
+        self.newColumns()
+
+    def newColumns(self):
+        self.sender = array.array("q")
+        self.packetNum = array.array("q")
+        self.sentTime = array.array("q")
+        self.receiveTime = array.array("q")
+        self.rate = array.array("d")
+
+    def record(self, sender, packetNum, sentTime, receiveTime, rate):
+        SummaryTrace.record(self, sender, packetNum, sentTime, receiveTime, rate)
+        self.sender.append(sender)
+        self.packetNum.append(packetNum)
+        self.sentTime.append(sentTime)
+        self.receiveTime.append(receiveTime)
+        self.rate.append(rate)
+        if len(self.sender) >= self.chunk:
+            self.flush()
+
+    def flush(self): # write the buffered columns in bulk
+        for field in FIELDS:
+            getattr(self, field).tofile(self.files[field])
+        self.newColumns()
+
+    def __reduce__(self): # snapshots (netsim.checkpoint) keep the totals, the records stay in the files
+        return (totalsTrace, (self.count, self.delaySum, self.delayMax, self.lastTime))
+
+    def close(self):
+        if self.files:
+            self.flush()
+            for field in FIELDS:
+                self.files[field].close()
+            self.files = {}
+            writeMeta(self.directory, self.count)
+
+class ArrayTrace(BinaryTrace):
+    # write the records in bulk into preallocated columns, one array per field (e.g. NumPy views of shared
+    # memory, netsim.parallel), records past the length of the columns are only counted
+    def __init__(self, columns, chunk=CHUNK):
+        SummaryTrace.__init__(self)
+        self.columns = columns # field -> array of the typecode of the field
+        self.chunk = chunk
+        self.written = 0 # num of records in the columns
+        self.overflow = 0 # num of records which did not fit
+        self.newColumns()
+
+    def flush(self):
+        n = len(self.sender)
+        k = min(n, len(self.columns["sender"]) - self.written)
+        for field in FIELDS:
+            self.columns[field][self.written:self.written + k] = memoryview(getattr(self, field))[:k]
+        self.written += k
+        self.overflow += n - k
+        self.newColumns()
+
+    def close(self):
+        self.flush()
+
+    def summary(self):
+        result = SummaryTrace.summary(self)
+        if self.overflow:
+            result["traceOverflow"] = self.overflow
+        return result
+
+def writeMeta(directory, count):
+    order = "<" if sys.byteorder == "little" else ">"
+    meta = {"count": count, "fields": list(FIELDS), "dtypes": {}}
+    for field in FIELDS:
+        meta["dtypes"][field] = order + DTYPES[TYPECODES[field]]
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+
+def readMeta(directory):
+    with open(os.path.join(directory, "meta.json")) as f:
+        return json.load(f)
+
+def openTrace(level=FULL, output=None, printFormat=CSV_FORMAT):
+    # sink for a trace level, output: None to print (in printFormat), a ".csv" file, a directory for binary columns,
+    # or a dict of preallocated columns (field -> array)
+    if level == OFF:
+        return None
+    if level == SUMMARY:
+        return SummaryTrace()
+    if level != FULL:
+        raise ValueError("unknown trace level: %r" % (level,))
+    if output is None:
+        return PrintTrace(printFormat)
+    if isinstance(output, dict):
+        return ArrayTrace(output)
+    if output.endswith(".csv"):
+        return CsvTrace(output)
+    return BinaryTrace(output)
+
+def readTrace(directory, chunk=CHUNK): # iterate over a binary trace, chunk records at a time as a dict of arrays
+    meta = readMeta(directory)
+    files = {}
+    for field in FIELDS:
+        files[field] = open(os.path.join(directory, field + ".bin"), "rb")
+    try:
+        remaining = meta["count"]
+        while remaining > 0:
+            n = min(chunk, remaining)
+            columns = {}
+            for field in FIELDS:
+                column = array.array(TYPECODES[field])
+                column.fromfile(files[field], n)
+                if meta["dtypes"][field][0] != ("<" if sys.byteorder == "little" else ">"):
+                    column.byteswap()
+                columns[field] = column
+            yield columns
+            remaining -= n
+    finally:
+        for field in FIELDS:
+            files[field].close()
+
+def exportCsv(directory, path, format=CSV_FORMAT): # convert a binary trace to the text format
+    with open(path, "w") as f:
+        for columns in readTrace(directory):
+            rate = [int(r) if r.is_integer() else r for r in columns["rate"]]
+            lines = [format % record + "\n" for record in zip(columns["sender"], columns["packetNum"],
+                columns["sentTime"], columns["receiveTime"], rate)]
+            f.writelines(lines)
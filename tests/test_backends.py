@@ -0,0 +1,36 @@
+# The object and the array sender backends must give identical runs (see also python -m netsim.crosscheck)
+
+import pytest
+
+from netsim.config import SimulationConfig
+from netsim.control import BcnControl
+from netsim.simulation import run_simulation
+
+pytest.importorskip("numpy") # the array backend
+
+def runBoth(control, **values): # summaries of the run on both backends
+    return [run_simulation(SimulationConfig(senderBackend=backend, traceLevel="summary", timeLimit=50000, **values),
+        control()) for backend in ("object", "array")]
+
+@pytest.mark.parametrize("numSender, bufferMax", [(2, 20), (5, 100), (4, 60)])
+def test_bcn_fractional_weight(numSender, bufferMax): # rates stay integers, on both backends
+    object, array = runBoth(lambda: BcnControl(weight=0.5), numSender=numSender, bufferMax=bufferMax)
+    assert object == array
+    assert isinstance(object["completionTime"], int)
+
+@pytest.mark.parametrize("meanOn, meanOff", [(500, 500), (30, 20), (50, 5000)])
+def test_onoff_next_times(meanOn, meanOff, monkeypatch): # the array draws give the times of one sender at a time
+    import numpy as np
+    from netsim import arrivals
+    monkeypatch.setattr(arrivals, "ON_OFF_VECTOR", 1)
+    array, object = arrivals.OnOffArrivals(meanOn, meanOff), arrivals.OnOffArrivals(meanOn, meanOff)
+    array.attach(300, np.random.SeedSequence(9))
+    object.attach(300, np.random.SeedSequence(9))
+    rng = np.random.default_rng(3)
+    time = -1
+    for step in range(40):
+        ids = np.sort(rng.choice(300, rng.integers(1, 300), replace=False))
+        rates = rng.integers(1, 3000, len(ids))
+        expected = [object.nextTime(id, time, rate) for id, rate in zip(ids.tolist(), rates.tolist())]
+        assert array.nextTimes(ids, time, rates).tolist() == expected
+        time = max(time, 0) + int(rng.integers(0, 5000))
@@ -0,0 +1,19 @@
+# Profiling counters
+
+from netsim.config import SimulationConfig
+from netsim.simulation import run_simulation
+
+def components(**values): # component -> calls of a profiled run
+    result = run_simulation(SimulationConfig(profile=True, traceLevel="summary", **values), "bcn")
+    return dict((name, value["calls"]) for name, value in result["profile"]["components"].items())
+
+def test_fractional_rates(): # the switch relays without Switch.send on the virtual clock, it is still counted
+    calls = components(rateDivisions=4, senderRate=2.5, switchRate=1.25, numPacket=50)
+    assert calls["Switch.send"] == 0
+    assert calls["Switch.relay"] == 2 * 50 # every packet relayed once
+    assert calls["Sender.transmit"] > 0
+
+def test_integer_rates(): # relay is counted under Switch.send too
+    calls = components(numPacket=50)
+    assert calls["Switch.send"] > 0
+    assert calls["Switch.relay"] == 2 * 50
@@ -0,0 +1,25 @@
+# Parallel runs with their traces in shared memory
+
+import pytest
+
+from netsim.config import SimulationConfig
+
+pytest.importorskip("numpy")
+
+from netsim.parallel import runShared
+
+def test_trace_after_close(): # closing is refused while a view of the block is alive, copies outlive the results
+    runs = [(SimulationConfig(numSender=2, numPacket=50), "bcn"), (SimulationConfig(numSender=3, numPacket=50), "fecn")]
+    with pytest.raises(RuntimeError):
+        with runShared(runs, workers=2) as results:
+            trace = results.trace(1)
+            kept = trace["receiveTime"].copy()
+    assert results.shared is not None # still mapped: the view can be used
+    assert (trace["receiveTime"] == kept).all()
+    assert len(kept) == results.summaries[1]["received"]
+    del trace
+    results.close()
+    assert results.shared is None
+    assert kept.sum() > 0
+    with pytest.raises(ValueError):
+        results.trace(0)